@@ -0,0 +1,150 @@
+"""Microbenchmark: per-page parse time of the single-pass parser vs. the old multi-sweep one.
+
+Parses the saved survey pages in tests/fixtures repeatedly and reports the
+median milliseconds per page for each parser.
+
+Usage (from module_5/):
+
+    python benchmarks/bench_parse_page.py --repeat 200
+"""
+
+# pylint: disable=too-many-locals, too-many-branches, invalid-name, wrong-import-position
+
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from src import scrape  # pylint: disable=import-error
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures", "survey_page_*.html")
+
+
+def legacy_parse_page(html):
+    """The previous multi-sweep parser, kept verbatim for comparison."""
+    results = []
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Collect all field lists in dictionaries
+    main = {
+        "universities": [d.get_text(strip=True) for d in soup.find_all(
+            "div", class_="tw-font-medium tw-text-gray-900 tw-text-sm")],
+        "programs": [],
+        "degree_types": [],
+        "comments": [],
+        "dates": [],
+        "statuses": [],
+        "urls": re.findall(r'https://www\.thegradcafe\.com/result/\d+\S*', str(soup))
+    }
+
+    # Parse program/degree
+    for td in soup.find_all("td", class_="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500"):
+        div = td.find("div", class_="tw-text-gray-900")
+        if div:
+            spans = div.find_all("span")
+            main["programs"].append(spans[0].get_text(strip=True) if spans else "N/A")
+            main["degree_types"].append(
+                spans[1].get_text(strip=True) if len(spans) > 1 else "N/A"
+            )
+
+    # Parse comments
+    for row in soup.find_all("tr"):
+        note = row.find("p", class_="tw-text-gray-500 tw-text-sm tw-my-0")
+        main["comments"].append(note.get_text(strip=True) if note else "N/A")
+
+    # Parse dates and statuses
+    for td in soup.find_all(
+        "td",
+        class_="tw-px-3 tw-py-5 tw-text-sm "
+               "tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell"
+    ):
+        if td.find("div"):
+            main["statuses"].append(td.get_text(strip=True))
+        else:
+            txt = td.get_text(strip=True)
+            if txt:
+                main["dates"].append(txt)
+
+    # Parse extra fields with fewer branches
+    extras = {"gpa": [], "gre_g": [], "gre_v": [], "gre_aw": [], "semester": [], "intl": []}
+    PATTERNS = [
+        ("GRE V", "gre_v"),
+        ("GRE AW", "gre_aw"),
+        ("GRE ", "gre_g"),
+        ("GPA", "gpa"),
+    ]
+
+    for tag in soup.find_all("div", class_=re.compile(r"tw-inline-flex")):
+        txt = tag.get_text(strip=True)
+
+        matched = False
+        for prefix, key in PATTERNS:
+            if txt.startswith(prefix):
+                extras[key].append(txt.replace(prefix, "").strip())
+                matched = True
+                break
+
+        if not matched:
+            if any(season in txt for season in ("Spring", "Fall", "Summer")):
+                extras["semester"].append(txt.strip())
+            elif txt in ("International", "American"):
+                extras["intl"].append(txt)
+
+    # Stitch final records
+    for i, uni in enumerate(main["universities"]):
+        results.append({
+            "university": uni,
+            "program": main["programs"][i] if i < len(main["programs"]) else "N/A",
+            "degree_type": main["degree_types"][i] if i < len(main["degree_types"]) else "N/A",
+            "comment": main["comments"][i] if i < len(main["comments"]) else "N/A",
+            "date_added": main["dates"][i] if i < len(main["dates"]) else "N/A",
+            "applicant_status": main["statuses"][i] if i < len(main["statuses"]) else "N/A",
+            "url": main["urls"][i] if i < len(main["urls"]) else "N/A",
+            "gpa": extras["gpa"][i] if i < len(extras["gpa"]) else "N/A",
+            "gre_general": extras["gre_g"][i] if i < len(extras["gre_g"]) else "N/A",
+            "gre_verbal": extras["gre_v"][i] if i < len(extras["gre_v"]) else "N/A",
+            "gre_aw": extras["gre_aw"][i] if i < len(extras["gre_aw"]) else "N/A",
+            "semester_start": extras["semester"][i] if i < len(extras["semester"]) else "N/A",
+            "international_status": extras["intl"][i] if i < len(extras["intl"]) else "N/A",
+        })
+
+    return results
+
+
+def _median_ms_per_page(parse, pages, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            parse(html)
+        samples.append((time.perf_counter() - start) * 1000.0 / len(pages))
+    return statistics.median(samples)
+
+
+def main():
+    """Run both parsers over the fixtures and print per-page timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+
+    print(f"{len(pages)} saved pages, tree builder: {scrape.PARSER}")
+    print(f"{'parser':<14} {'ms/page':>9}")
+    for name, parse in (("multi-sweep", legacy_parse_page), ("single-pass", scrape.parse_page)):
+        print(f"{name:<14} {_median_ms_per_page(parse, pages, args.repeat):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Concurrent, connection-reusing page fetcher for the GradCafe scraper."""
+
+# pylint: disable=too-many-instance-attributes, too-many-arguments
+
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+BASE_URL = "https://www.thegradcafe.com/survey/?page={page}"
+
+# Responses worth retrying: throttling and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """Raised when a page still fails after all retries."""
+
+
+class _HostLimiter:
+    """Caps in-flight requests and spaces request starts for one host."""
+
+    def __init__(self, max_concurrent, rate_per_sec):
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.interval = 1.0 / rate_per_sec if rate_per_sec else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait_turn(self):
+        """Block until this host may receive another request."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class PageFetcher:
+    """
+    Fetch survey pages concurrently with a thread pool.
+
+    Each worker thread keeps one persistent (keep-alive) HTTP connection per host.
+    Requests to a host are limited to ``per_host`` in flight and ``rate_per_sec``
+    starts per second. Failed requests are retried with exponential backoff.
+    """
+
+    def __init__(self, base_url=BASE_URL, max_workers=8, per_host=4,
+                 rate_per_sec=4.0, retries=3, backoff=0.5, timeout=30):
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.rate_per_sec = rate_per_sec
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._local = threading.local()
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+    def _limiter(self, host):
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = _HostLimiter(self.per_host, self.rate_per_sec)
+            return self._limiters[host]
+
+    def _connection(self, scheme, netloc):
+        """Return this thread's persistent connection to scheme://netloc."""
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+        return conn
+
+    def _drop_connection(self, scheme, netloc):
+        conn = self._local.conns.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def fetch_url(self, url):
+        """GET one URL and return its body decoded as UTF-8."""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        limiter = self._limiter(parts.netloc)
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            with limiter.slots:
+                limiter.wait_turn()
+                conn = self._connection(parts.scheme, parts.netloc)
+                try:
+                    conn.request("GET", path, headers={"Connection": "keep-alive"})
+                    resp = conn.getresponse()
+                    body = resp.read()
+                except (OSError, http.client.HTTPException) as exc:
+                    # Stale keep-alive socket or network error: reconnect on retry.
+                    self._drop_connection(parts.scheme, parts.netloc)
+                    last_error = exc
+                    continue
+            if resp.status == 200:
+                return body.decode("utf-8")
+            last_error = FetchError(f"{url}: HTTP {resp.status}")
+            if resp.status not in RETRY_STATUSES:
+                break
+        raise FetchError(f"giving up on {url}") from last_error
+
+    def fetch_page(self, page_num):
+        """Fetch raw HTML for a given page number."""
+        return self.fetch_url(self.base_url.format(page=page_num))
+
+    def fetch_pages(self, page_nums):
+        """Yield (page_num, html) for every page, in the order given."""
+        page_nums = list(page_nums)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            yield from zip(page_nums, pool.map(self.fetch_page, page_nums))
@@ -3,109 +3,128 @@
 # pylint: disable=too-many-locals, too-many-branches, invalid-name
 # pylint: disable=no-member
 
-from urllib.request import urlopen
+from importlib.util import find_spec
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
+from src.fetcher import PageFetcher
 
-def fetch_page_html(page_num):
-    """Fetch raw HTML for a given page number."""
-    url = f"https://www.thegradcafe.com/survey/?page={page_num}"
-    with urlopen(url) as page:
-        return page.read().decode("utf-8")
+# lxml builds the tree several times faster than html.parser when it is installed.
+PARSER = "lxml" if find_spec("lxml") else "html.parser"
 
+UNIVERSITY_CLASS = "tw-font-medium tw-text-gray-900 tw-text-sm"
+COMMENT_CLASS = "tw-text-gray-500 tw-text-sm tw-my-0"
+RESULT_URL_RE = re.compile(r"^https://www\.thegradcafe\.com/result/\d+")
 
-def scrape_data(pages=1500):
-    """Scrape applicant data from multiple pages into a list of dicts."""
+# Badge prefixes, most specific first ("GRE V" before "GRE ")
+BADGE_PREFIXES = [
+    ("GRE V", "gre_verbal"),
+    ("GRE AW", "gre_aw"),
+    ("GRE ", "gre_general"),
+    ("GPA", "gpa"),
+]
+
+RECORD_FIELDS = (
+    "university", "program", "degree_type", "comment", "date_added",
+    "applicant_status", "url", "gpa", "gre_general", "gre_verbal", "gre_aw",
+    "semester_start", "international_status",
+)
+
+# Only result rows are needed, so skip building the rest of the document.
+_ONLY_ROWS = SoupStrainer("tr")
+
+
+def scrape_data(pages=1500, fetcher=None):
+    """
+    Scrape applicant data from multiple pages into a list of dicts.
+
+    Pages are downloaded concurrently by ``fetcher`` (a PageFetcher by default)
+    and parsed in page order, so the output matches a serial crawl.
+    """
+    fetcher = fetcher or PageFetcher()
     results = []
 
-    for page_num in range(1, pages + 1):
-        soup = BeautifulSoup(fetch_page_html(page_num), "html.parser")
-
-        # Collect all field lists in dictionaries
-        main = {
-            "universities": [d.get_text(strip=True) for d in soup.find_all(
-                "div", class_="tw-font-medium tw-text-gray-900 tw-text-sm")],
-            "programs": [],
-            "degree_types": [],
-            "comments": [],
-            "dates": [],
-            "statuses": [],
-            "urls": re.findall(r'https://www\.thegradcafe\.com/result/\d+\S*', str(soup))
-        }
-
-        # Parse program/degree
-        for td in soup.find_all("td", class_="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500"):
-            div = td.find("div", class_="tw-text-gray-900")
-            if div:
-                spans = div.find_all("span")
-                main["programs"].append(spans[0].get_text(strip=True) if spans else "N/A")
-                main["degree_types"].append(
-                    spans[1].get_text(strip=True) if len(spans) > 1 else "N/A"
-                )
-
-        # Parse comments
-        for row in soup.find_all("tr"):
-            note = row.find("p", class_="tw-text-gray-500 tw-text-sm tw-my-0")
-            main["comments"].append(note.get_text(strip=True) if note else "N/A")
-
-        # Parse dates and statuses
-        for td in soup.find_all(
-            "td",
-            class_="tw-px-3 tw-py-5 tw-text-sm "
-                   "tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell"
-        ):
-            if td.find("div"):
-                main["statuses"].append(td.get_text(strip=True))
+    for _, html in fetcher.fetch_pages(range(1, pages + 1)):
+        results.extend(parse_page(html))
+
+    return results
+
+
+def parse_page(html):
+    """
+    Parse one survey page into a list of applicant dicts.
+
+    Each result is a main ``<tr>`` (school, program, date, status, link) followed by
+    optional detail rows (badges such as term, GPA and GRE, and a comment). Rows are
+    visited once, in document order, and each record is built from its own rows.
+    """
+    soup = BeautifulSoup(html, PARSER, parse_only=_ONLY_ROWS)
+    results = []
+    record = None
+
+    for tr in soup.find_all("tr"):
+        uni = tr.find("div", class_=UNIVERSITY_CLASS)
+        if uni is not None:
+            record = _parse_main_row(tr, uni)
+            results.append(record)
+        elif record is not None:
+            _parse_detail_row(tr, record)
+
+    return results
+
+
+def _parse_main_row(tr, uni):
+    """Start a record from the row that carries school, program, date and status."""
+    record = dict.fromkeys(RECORD_FIELDS, "N/A")
+    record["university"] = uni.get_text(strip=True)
+
+    for td in tr.find_all("td"):
+        classes = td.get("class") or ()
+        if "tw-whitespace-nowrap" in classes:
+            # Decision cells wrap their text in a <div>; date cells are bare text
+            if td.div is not None:
+                record["applicant_status"] = td.get_text(strip=True)
             else:
                 txt = td.get_text(strip=True)
                 if txt:
-                    main["dates"].append(txt)
-
-        # Parse extra fields with fewer branches
-        extras = {"gpa": [], "gre_g": [], "gre_v": [], "gre_aw": [], "semester": [], "intl": []}
-        PATTERNS = [
-            ("GRE V", "gre_v"),
-            ("GRE AW", "gre_aw"),
-            ("GRE ", "gre_g"),
-            ("GPA", "gpa"),
-        ]
-
-        for tag in soup.find_all("div", class_=re.compile(r"tw-inline-flex")):
-            txt = tag.get_text(strip=True)
-
-            matched = False
-            for prefix, key in PATTERNS:
-                if txt.startswith(prefix):
-                    extras[key].append(txt.replace(prefix, "").strip())
-                    matched = True
-                    break
-
-            if not matched:
-                if any(season in txt for season in ("Spring", "Fall", "Summer")):
-                    extras["semester"].append(txt.strip())
-                elif txt in ("International", "American"):
-                    extras["intl"].append(txt)
-
-        # Stitch final records
-        for i, uni in enumerate(main["universities"]):
-            results.append({
-                "university": uni,
-                "program": main["programs"][i] if i < len(main["programs"]) else "N/A",
-                "degree_type": main["degree_types"][i] if i < len(main["degree_types"]) else "N/A",
-                "comment": main["comments"][i] if i < len(main["comments"]) else "N/A",
-                "date_added": main["dates"][i] if i < len(main["dates"]) else "N/A",
-                "applicant_status": main["statuses"][i] if i < len(main["statuses"]) else "N/A",
-                "url": main["urls"][i] if i < len(main["urls"]) else "N/A",
-                "gpa": extras["gpa"][i] if i < len(extras["gpa"]) else "N/A",
-                "gre_general": extras["gre_g"][i] if i < len(extras["gre_g"]) else "N/A",
-                "gre_verbal": extras["gre_v"][i] if i < len(extras["gre_v"]) else "N/A",
-                "gre_aw": extras["gre_aw"][i] if i < len(extras["gre_aw"]) else "N/A",
-                "semester_start": extras["semester"][i] if i < len(extras["semester"]) else "N/A",
-                "international_status": extras["intl"][i] if i < len(extras["intl"]) else "N/A",
-            })
+                    record["date_added"] = txt
+        elif "tw-px-3" in classes:
+            div = td.find("div", class_="tw-text-gray-900")
+            if div is not None:
+                spans = div.find_all("span")
+                if spans:
+                    record["program"] = spans[0].get_text(strip=True)
+                if len(spans) > 1:
+                    record["degree_type"] = spans[1].get_text(strip=True)
+        else:
+            link = td.find("a", href=RESULT_URL_RE)
+            if link is not None:
+                record["url"] = link["href"]
+    return record
+
+
+def _parse_detail_row(tr, record):
+    """Fill badges (term, citizenship, GPA/GRE) and the comment from a follow-up row."""
+    note = tr.find("p", class_=COMMENT_CLASS)
+    if note is not None:
+        record["comment"] = note.get_text(strip=True)
+
+    for tag in tr.find_all("div", class_=_is_badge):
+        txt = tag.get_text(strip=True)
+        for prefix, key in BADGE_PREFIXES:
+            if txt.startswith(prefix):
+                record[key] = txt.replace(prefix, "").strip()
+                break
+        else:
+            if any(season in txt for season in ("Spring", "Fall", "Summer")):
+                record["semester_start"] = txt
+            elif txt in ("International", "American"):
+                record["international_status"] = txt
+
+
+def _is_badge(css_class):
+    return css_class is not None and "tw-inline-flex" in css_class
 
-    return results
 
 if __name__ == "__main__":
     scrape_data(5)
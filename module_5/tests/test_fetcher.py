@@ -0,0 +1,121 @@
+"""Tests for the concurrent page fetcher against a local HTTP stand-in."""
+
+# pylint: disable=redefined-outer-name
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import scrape  # pylint: disable=wrong-import-position, import-error
+from fetcher import FetchError, PageFetcher  # pylint: disable=wrong-import-position, import-error
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _saved_page(num):
+    with open(os.path.join(FIXTURES, f"survey_page_{num}.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+class _SurveyHandler(BaseHTTPRequestHandler):
+    """Serves saved survey pages over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serve /survey/?page=N from the fixtures directory."""
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.clients.add(self.client_address)
+            fail = server.failures_left > 0
+            if fail:
+                server.failures_left -= 1
+
+        page = int(parse_qs(urlsplit(self.path).query)["page"][0])
+        status, body = (503, b"busy") if fail else (200, _saved_page(page).encode("utf-8"))
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep test output quiet."""
+
+
+@pytest.fixture
+def survey_server():
+    """Run a local stand-in for thegradcafe.com on an ephemeral port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SurveyHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.clients = set()
+    server.failures_left = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _fetcher(server, **kwargs):
+    host, port = server.server_address
+    kwargs.setdefault("rate_per_sec", 0)
+    kwargs.setdefault("backoff", 0.01)
+    return PageFetcher(base_url=f"http://{host}:{port}/survey/?page={{page}}", **kwargs)
+
+
+@pytest.mark.scrape
+def test_concurrent_scrape_matches_serial_parse(survey_server):
+    """Concurrent fetching yields the same records, in page order, as parsing serially."""
+    expected = scrape.parse_page(_saved_page(1)) + scrape.parse_page(_saved_page(2))
+
+    data = scrape.scrape_data(pages=2, fetcher=_fetcher(survey_server, max_workers=2))
+
+    assert data == expected
+    assert set(data[0]) == {
+        "university", "program", "degree_type", "comment", "date_added",
+        "applicant_status", "url", "gpa", "gre_general", "gre_verbal", "gre_aw",
+        "semester_start", "international_status",
+    }
+
+
+@pytest.mark.scrape
+def test_connections_are_kept_alive(survey_server):
+    """A single worker reuses one connection for every page."""
+    fetcher = _fetcher(survey_server, max_workers=1)
+
+    pages = list(fetcher.fetch_pages([1, 2, 1, 2]))
+
+    assert [num for num, _ in pages] == [1, 2, 1, 2]
+    assert survey_server.requests == 4
+    assert len(survey_server.clients) == 1
+
+
+@pytest.mark.scrape
+def test_transient_errors_are_retried(survey_server):
+    """503 responses are retried with backoff until the page succeeds."""
+    survey_server.failures_left = 2
+
+    html = _fetcher(survey_server, retries=3).fetch_page(1)
+
+    assert "GradCafe Survey - Page 1" in html
+    assert survey_server.requests == 3
+
+
+@pytest.mark.scrape
+def test_gives_up_after_retries(survey_server):
+    """Persistent failures raise FetchError instead of looping forever."""
+    survey_server.failures_left = 10
+
+    with pytest.raises(FetchError):
+        _fetcher(survey_server, retries=1).fetch_page(1)
+    assert survey_server.requests == 2
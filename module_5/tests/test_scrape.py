@@ -9,50 +9,49 @@ import scrape  # pylint: disable=import-error  # keep at top now
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
 
-class FakeResponse: # pylint: disable=too-few-public-methods
-    """Fake response object for urlopen that returns preset HTML."""
+class FakeFetcher: # pylint: disable=too-few-public-methods
+    """Fake PageFetcher that serves preset HTML for every page."""
 
     def __init__(self, html):
         self.html = html
 
-    def read(self):
-        """Return the fake HTML as bytes."""
-        return self.html.encode("utf-8")
+    def fetch_pages(self, page_nums):
+        """Yield (page_num, html) pairs without touching the network."""
+        for num in page_nums:
+            yield num, self.html
 
 
 @pytest.mark.scrape
-def test_scrape_data_with_fake_html(monkeypatch):
+def test_scrape_data_with_fake_html():
     """Test scrape_data on a page with all expected fields."""
     fake_html = """
     <html>
       <body>
-        <div class="tw-font-medium tw-text-gray-900 tw-text-sm">Fake University</div>
-        <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500">
-          <div class="tw-text-gray-900">
-            <span>Computer Science</span><span>Masters</span>
-          </div>
-        </td>
-        <tr>
-          <p class="tw-text-gray-500 tw-text-sm tw-my-0">Great program!</p>
-        </tr>
-        <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
-          2025-01-01
-        </td>
-        <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
-          <div>Status</div>
-        </td>
-        <a href="https://www.thegradcafe.com/result/12345">Result</a>
+        <table>
+          <tr>
+            <td><div class="tw-font-medium tw-text-gray-900 tw-text-sm">Fake University</div></td>
+            <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500">
+              <div class="tw-text-gray-900">
+                <span>Computer Science</span><span>Masters</span>
+              </div>
+            </td>
+            <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
+              2025-01-01
+            </td>
+            <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
+              <div>Status</div>
+            </td>
+            <td><a href="https://www.thegradcafe.com/result/12345">Result</a></td>
+          </tr>
+          <tr>
+            <td><p class="tw-text-gray-500 tw-text-sm tw-my-0">Great program!</p></td>
+          </tr>
+        </table>
       </body>
     </html>
     """
 
-    def fake_urlopen(_url):
-        """Return FakeResponse with the preset HTML."""
-        return FakeResponse(fake_html)
-
-    monkeypatch.setattr(scrape, "urlopen", fake_urlopen)
-
-    data = scrape.scrape_data(pages=1)
+    data = scrape.scrape_data(pages=1, fetcher=FakeFetcher(fake_html))
 
     assert len(data) == 1
     assert data[0]["university"] == "Fake University"
@@ -64,44 +63,50 @@ def test_scrape_data_with_fake_html(monkeypatch):
     assert data[0]["url"].startswith("https://www.thegradcafe.com/result/")
 
 
-class DummyResponse: # pylint: disable=too-few-public-methods
-    """Another fake urlopen response."""
-
-    def __init__(self, text):
-        self._text = text
-
-    def read(self):
-        """Return the fake HTML as bytes."""
-        return self._text.encode("utf-8")
-
-
 @pytest.mark.scrape
-def test_scrape_handles_missing_extra_fields(monkeypatch):
+def test_scrape_handles_missing_extra_fields():
     """Test scrape_data handles missing GPA / GRE gracefully."""
     fake_html = """
     <html>
       <body>
-        <div class="tw-font-medium tw-text-gray-900 tw-text-sm">Fake University</div>
-        <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500">
-          <div class="tw-text-gray-900">
-            <span>Math</span><span>PhD</span>
-          </div>
-        </td>
-        <tr>
-          <p class="tw-text-gray-500 tw-text-sm tw-my-0">No extras</p>
-        </tr>
-        <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
-          2025-02-01
-        </td>
-        <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
-          <div>Pending</div>
-        </td>
-        <a href="https://www.thegradcafe.com/result/67890">Result</a>
+        <table>
+          <tr>
+            <td><div class="tw-font-medium tw-text-gray-900 tw-text-sm">Fake University</div></td>
+            <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500">
+              <div class="tw-text-gray-900">
+                <span>Math</span><span>PhD</span>
+              </div>
+            </td>
+            <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
+              2025-02-01
+            </td>
+            <td class="tw-px-3 tw-py-5 tw-text-sm tw-text-gray-500 tw-whitespace-nowrap tw-hidden md:tw-table-cell">
+              <div>Pending</div>
+            </td>
+            <td><a href="https://www.thegradcafe.com/result/67890">Result</a></td>
+          </tr>
+          <tr>
+            <td><p class="tw-text-gray-500 tw-text-sm tw-my-0">No extras</p></td>
+          </tr>
+        </table>
       </body>
     </html>
     """
 
-    monkeypatch.setattr(scrape, "urlopen", lambda _ignored: DummyResponse(fake_html))
-
-    data = scrape.scrape_data(pages=1)
+    data = scrape.scrape_data(pages=1, fetcher=FakeFetcher(fake_html))
     assert data[0]["gpa"] == "N/A"  # ensures missing fields handled
+
+
+@pytest.mark.scrape
+def test_parse_page_builds_each_record_from_its_rows():
+    """Details (badges, comment) attach to the result they follow on a saved page."""
+    path = os.path.join(os.path.dirname(__file__), "fixtures", "survey_page_1.html")
+    with open(path, encoding="utf-8") as f:
+        data = scrape.parse_page(f.read())
+
+    assert len(data) == 20
+    assert data[0]["url"] == "https://www.thegradcafe.com/result/899900"
+    assert data[0]["comment"] == "Comment for result 899900."
+    assert data[0]["gre_verbal"] == "167"
+    assert data[1]["comment"] == "N/A"  # second result has no comment row
+    assert data[1]["gpa"] == "3.09"
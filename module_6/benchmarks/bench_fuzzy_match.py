@@ -0,0 +1,87 @@
+"""Benchmark: difflib scans vs. the bigram MatchIndex for canon-name post-normalization.
+
+Queries are canon university/program names with a few random typos, matched at
+the cutoffs app.py uses (0.86 universities, 0.84 programs). Reports the median
+per-query latency of each strategy and checks that both return the same match.
+
+Usage:
+
+    python benchmarks/bench_fuzzy_match.py --queries 2000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import os
+import random
+import statistics
+import sys
+import time
+
+LLM_DIR = os.path.join(os.path.dirname(__file__), "..", "worker", "etl", "llm_hosting")
+os.environ.setdefault("CANON_UNIS_PATH", os.path.join(LLM_DIR, "canon_universities.txt"))
+os.environ.setdefault("CANON_PROGS_PATH", os.path.join(LLM_DIR, "canon_programs.txt"))
+os.environ["LLM_CACHE_PATH"] = ""
+sys.path.insert(0, LLM_DIR)
+
+import app as llm_app  # pylint: disable=import-error, wrong-import-position
+
+
+def _typo(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 4)):
+        i = rng.randrange(len(chars) + 1)
+        op = rng.random()
+        if op < 0.33 and i < len(chars):
+            del chars[i]
+        elif op < 0.66:
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz ,"))
+        elif i < len(chars):
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def _difflib(name: str, canon: list[str], cutoff: float) -> str | None:
+    matches = difflib.get_close_matches(name, canon, n=1, cutoff=cutoff)
+    return matches[0] if matches else None
+
+
+def _time(fn, queries, repeat: int) -> float:
+    """Median microseconds per query over `repeat` passes."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        runs.append((time.perf_counter() - start) / len(queries) * 1e6)
+    return statistics.median(runs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cases = [
+        ("universities", llm_app.CANON_UNIS, llm_app.UNI_INDEX, 0.86),
+        ("programs", llm_app.CANON_PROGS, llm_app.PROG_INDEX, 0.84),
+    ]
+    print(f"{'list':<13} {'size':>5} {'difflib us':>11} {'index us':>9} {'speedup':>8}")
+    for label, canon, index, cutoff in cases:
+        queries = [_typo(rng, rng.choice(canon)) for _ in range(args.queries)]
+        mismatches = sum(
+            _difflib(q, canon, cutoff) != index.best(q, cutoff) for q in queries
+        )
+        if mismatches:
+            sys.exit(f"{label}: {mismatches} queries disagree with difflib")
+
+        slow = _time(lambda q, c=canon, k=cutoff: _difflib(q, c, k), queries, args.repeat)
+        fast = _time(lambda q, i=index, k=cutoff: i.best(q, k), queries, args.repeat)
+        print(f"{label:<13} {len(canon):>5} {slow:>11.1f} {fast:>9.1f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
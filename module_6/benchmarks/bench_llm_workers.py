@@ -0,0 +1,77 @@
+"""Benchmark: LLM standardization throughput (rows/sec) at 1, 2, 4 and 8 model workers.
+
+Each worker is a separate process with its own llama.cpp model and an equal
+share of N_THREADS. Inputs are distinct "<program>, <university>" strings built
+from the canon lists, and the result cache is disabled, so every row runs a
+real completion. Model loading is excluded from the timings.
+
+Usage (downloads the GGUF model on first run):
+
+    python benchmarks/bench_llm_workers.py --rows 64 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+LLM_DIR = os.path.join(os.path.dirname(__file__), "..", "worker", "etl", "llm_hosting")
+os.environ.setdefault("CANON_UNIS_PATH", os.path.join(LLM_DIR, "canon_universities.txt"))
+os.environ.setdefault("CANON_PROGS_PATH", os.path.join(LLM_DIR, "canon_programs.txt"))
+os.environ["LLM_CACHE_PATH"] = ""
+sys.path.insert(0, LLM_DIR)
+
+import app as llm_app  # pylint: disable=import-error, wrong-import-position
+
+
+def _inputs(n: int) -> list[str]:
+    rng = random.Random(0)
+    return [
+        f"{rng.choice(llm_app.CANON_PROGS)}, {rng.choice(llm_app.CANON_UNIS)}"
+        for _ in range(n)
+    ]
+
+
+def _run(texts: list[str], workers: int) -> float:
+    """Return rows/sec for one worker count (cache off, model load excluded)."""
+    llm_app.CACHE = llm_app.ResultCache("", mem_size=0)
+    if workers == 1:
+        llm_app._load_llm()  # pylint: disable=protected-access
+        start = time.perf_counter()
+        for text in texts:
+            llm_app._call_llm(text)  # pylint: disable=protected-access
+        return len(texts) / (time.perf_counter() - start)
+
+    threads = max(1, llm_app.N_THREADS // workers)
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(workers, initializer=llm_app._init_worker,  # pylint: disable=protected-access
+                  initargs=(threads,)) as pool:
+        # Warm up: one row per worker so every model is loaded before timing.
+        pool.map(llm_app._call_llm, texts[:workers], chunksize=1)  # pylint: disable=protected-access
+        start = time.perf_counter()
+        for _ in llm_app._standardize_stream(texts, pool=pool):  # pylint: disable=protected-access
+            pass
+        return len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    texts = _inputs(args.rows)
+    print(f"{args.rows} rows, N_THREADS={llm_app.N_THREADS}")
+    print(f"{'workers':>7} {'threads/worker':>15} {'rows/sec':>9}")
+    for workers in args.workers:
+        rate = _run(texts, workers)
+        threads = llm_app.N_THREADS if workers == 1 else max(1, llm_app.N_THREADS // workers)
+        print(f"{workers:>7} {threads:>15} {rate:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
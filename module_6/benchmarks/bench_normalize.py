@@ -0,0 +1,127 @@
+"""Benchmark: per-row JSONL normalization vs. the batched etl/normalize.py engine.
+
+Generates scraper-style records (the same generator as bench_bulk_load.py) and
+normalizes them two ways:
+
+* legacy  - the per-record mapping every loader used to carry: a regex search
+            per numeric field and a strptime per date
+* batched - etl.normalize.normalize_rows over BATCH_SIZE-record batches
+
+Both must produce identical rows; the script exits non-zero otherwise. Reports
+the per-row cost of each. Needs no database.
+
+Usage:
+
+    python benchmarks/bench_normalize.py --rows 200000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+from bench_bulk_load import _record  # pylint: disable=import-error
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "worker"))
+
+from etl import normalize  # pylint: disable=import-error, wrong-import-position
+
+
+def _legacy_float(v):
+    if v in (None, "", "N/A"):
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    m = re.search(r"[-+]?\d*\.?\d+", str(v).strip())
+    return float(m.group()) if m else None
+
+
+def _legacy_date(v):
+    if v in (None, "", "N/A"):
+        return None
+    s = str(v).strip()
+    m = re.match(r"(\d{4}-\d{2}-\d{2})", s)
+    if m:
+        try:
+            return date.fromisoformat(m.group(1))
+        except ValueError:
+            return None
+    if s.lower().startswith("added on"):
+        s = s[len("added on"):].strip()
+    for fmt in ("%B %d, %Y", "%b %d, %Y"):
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _legacy_year(term):
+    m = re.search(r"\d{4}", term) if isinstance(term, str) else None
+    return int(m.group()) if m else 0
+
+
+def _legacy_clean(v):
+    return None if v in ("N/A", "", None) else v
+
+
+def _legacy_row(entry):
+    return (
+        _legacy_clean(entry.get("program")),
+        _legacy_clean(entry.get("degree_type")),
+        _legacy_clean(entry.get("comments")),
+        _legacy_date(entry.get("date_added")),
+        _legacy_clean(entry.get("status")),
+        _legacy_clean(entry.get("url")),
+        _legacy_float(entry.get("GPA")),
+        _legacy_float(entry.get("GRE_G")),
+        _legacy_float(entry.get("GRE_V")),
+        _legacy_float(entry.get("GRE_AW")),
+        _legacy_clean(entry.get("term")),
+        _legacy_clean(entry.get("US/International")),
+        _legacy_clean(entry.get("llm-generated-program")),
+        _legacy_clean(entry.get("llm-generated-university")),
+        _legacy_clean(entry.get("university")),
+        _legacy_year(entry.get("term")),
+    )
+
+
+def _timed(fn, repeat: int):
+    samples, out = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    records = [_record(rng, n) for n in range(args.rows)]
+
+    legacy_s, legacy = _timed(lambda: [_legacy_row(e) for e in records], args.repeat)
+    batched_s, batched = _timed(lambda: list(normalize.iter_rows(records)), args.repeat)
+    if legacy != batched:
+        sys.exit("batched normalization differs from the per-row mapping")
+
+    print(f"{args.rows:,} records, median of {args.repeat} runs; both paths produced identical rows")
+    print(f"{'path':<8} {'seconds':>8} {'us/row':>7}")
+    for name, secs in (("legacy", legacy_s), ("batched", batched_s)):
+        print(f"{name:<8} {secs:>8.2f} {secs / args.rows * 1e6:>7.2f}")
+    print(f"speedup  {legacy_s / batched_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,30 @@
--- Minimal schema + unique constraint on URL
+-- Guard: databases created before partitioning have a plain applicants table,
+-- which CREATE TABLE IF NOT EXISTS would silently keep while the statements below
+-- (partitions, term_year keys) fail half-way. Stop with the fix instead.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_class
+             WHERE oid = to_regclass('applicants') AND relkind <> 'p') THEN
+    RAISE EXCEPTION 'applicants is not partitioned; it predates this schema'
+      USING HINT = 'Reload it as described in README.md: DROP TABLE applicants CASCADE, '
+                   're-run db/init.sql, then run init_loader.';
+  END IF;
+END
+$$;
+
+-- Applicants, range-partitioned by admission cycle: term_year is parsed from
+-- term at ingest (0 = unknown). Term-scoped metrics prune to one partition, and
+-- retiring an old cycle is DROP TABLE / DETACH PARTITION instead of a bulk DELETE.
+-- Unique constraints must include the partition key, so URLs are unique per
+-- cycle; a re-scraped post keeps its term, so ON CONFLICT (url, term_year) skips it.
 CREATE TABLE IF NOT EXISTS applicants (
-  id SERIAL PRIMARY KEY,
+  id SERIAL,
   program TEXT,
   degree TEXT,
   comments TEXT,
-  date_added TEXT,
+  date_added DATE,                 -- parsed at ingest from "Added on March 31, 2024" / ISO
   status TEXT,
-  url TEXT UNIQUE,
+  url TEXT,
   gpa DOUBLE PRECISION,
   gre DOUBLE PRECISION,
   gre_v DOUBLE PRECISION,
@@ -15,16 +33,133 @@ CREATE TABLE IF NOT EXISTS applicants (
   us_or_international TEXT,
   llm_generated_program TEXT,
   llm_generated_university TEXT,
-  university TEXT
+  university TEXT,
+  term_year INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (id, term_year),
+  UNIQUE (url, term_year)
+) PARTITION BY RANGE (term_year);
+
+-- One partition per admission cycle; unknown (0) and out-of-range years go to the
+-- default partition. Create a cycle's partition before its rows arrive: Postgres
+-- refuses to add a partition whose range already has rows in the default.
+CREATE OR REPLACE FUNCTION create_applicant_partitions(first_year INT, last_year INT)
+RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+  FOR y IN first_year..last_year LOOP
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF applicants FOR VALUES FROM (%s) TO (%s)',
+      'applicants_' || y, y, y + 1
+    );
+  END LOOP;
+END
+$$;
+SELECT create_applicant_partitions(2000, 2035);
+CREATE TABLE IF NOT EXISTS applicants_default PARTITION OF applicants DEFAULT;
+
+CREATE INDEX IF NOT EXISTS applicants_date_added_idx ON applicants (date_added);
+
+-- Normalized, lower-cased categories derived at insert time (STORED generated
+-- columns, so every ingest path fills them; term_year above is the partition
+-- key, which cannot be generated, so loaders set it). Metric queries filter on
+-- these with plain equality instead of leading-wildcard ILIKE, so btree indexes apply.
+-- ADD COLUMN IF NOT EXISTS: re-running this file migrates an existing database.
+ALTER TABLE applicants
+  ADD COLUMN IF NOT EXISTS term_season TEXT      -- fall | spring | summer | winter
+    GENERATED ALWAYS AS (substring(lower(term) FROM '(fall|spring|summer|winter)')) STORED,
+  ADD COLUMN IF NOT EXISTS status_kind TEXT      -- accepted | rejected | waitlisted | interview | other
+    GENERATED ALWAYS AS (CASE
+      WHEN status ~* '^\s*accept' THEN 'accepted'
+      WHEN status ~* '^\s*reject' THEN 'rejected'
+      WHEN status ~* 'wait' THEN 'waitlisted'
+      WHEN status ~* 'interview' THEN 'interview'
+      WHEN status IS NOT NULL THEN 'other'
+    END) STORED,
+  ADD COLUMN IF NOT EXISTS degree_level TEXT     -- phd | masters | other
+    GENERATED ALWAYS AS (CASE
+      WHEN degree ~* '(phd|ph\.d|doctor)' THEN 'phd'
+      WHEN degree ~* '(master|ms|m\.s\.)' THEN 'masters'
+      WHEN degree IS NOT NULL THEN 'other'
+    END) STORED;
+
+CREATE INDEX IF NOT EXISTS applicants_term_idx ON applicants (term_year, term_season);
+CREATE INDEX IF NOT EXISTS applicants_status_kind_idx ON applicants (status_kind, term_year);
+CREATE INDEX IF NOT EXISTS applicants_degree_level_idx ON applicants (degree_level);
+
+-- Free-text names keep their ILIKE '%...%' filters; trigram GIN indexes serve them.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS applicants_llm_university_trgm
+  ON applicants USING gin (llm_generated_university gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS applicants_llm_program_trgm
+  ON applicants USING gin (llm_generated_program gin_trgm_ops);
+
+-- Background jobs requested through the web tier; the worker records progress.
+-- The partial unique index lets duplicate requests join the job already in flight.
+CREATE TABLE IF NOT EXISTS jobs (
+  id BIGSERIAL PRIMARY KEY,
+  kind TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued',   -- queued | running | succeeded | failed
+  dedupe_key TEXT,
+  rows_seen BIGINT,
+  rows_inserted BIGINT,
+  error TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  started_at TIMESTAMPTZ,
+  finished_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_dedupe
+  ON jobs (dedupe_key) WHERE status IN ('queued', 'running');
+
+-- Change counter for the summary: ingests bump data_version, recompute_analytics
+-- records the version it refreshed and skips when nothing changed since.
+CREATE TABLE IF NOT EXISTS analytics_state (
+  id INT PRIMARY KEY CHECK (id = 1),
+  data_version BIGINT NOT NULL DEFAULT 0,
+  refreshed_version BIGINT,               -- NULL until the first refresh
+  refreshed_at TIMESTAMPTZ
+);
+INSERT INTO analytics_state (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+-- Dashboard counters maintained by ingest: each batch's sums/counts are added in the
+-- same transaction as its INSERT (worker/consumer.py SUMMARY_COUNTERS), so the
+-- dashboard stays current without rescanning applicants. rebuilt_at is NULL until
+-- recompute_analytics seeds the row with one full scan.
+CREATE TABLE IF NOT EXISTS applicant_summary_counters (
+  id INT PRIMARY KEY CHECK (id = 1),
+  n_total BIGINT NOT NULL DEFAULT 0,
+  n_fall2025 BIGINT NOT NULL DEFAULT 0,
+  n_international BIGINT NOT NULL DEFAULT 0,
+  sum_gpa DOUBLE PRECISION NOT NULL DEFAULT 0,
+  n_gpa BIGINT NOT NULL DEFAULT 0,
+  sum_gre DOUBLE PRECISION NOT NULL DEFAULT 0,
+  n_gre BIGINT NOT NULL DEFAULT 0,
+  sum_gre_v DOUBLE PRECISION NOT NULL DEFAULT 0,
+  n_gre_v BIGINT NOT NULL DEFAULT 0,
+  sum_gre_aw DOUBLE PRECISION NOT NULL DEFAULT 0,
+  n_gre_aw BIGINT NOT NULL DEFAULT 0,
+  sum_gpa_american_fall2025 DOUBLE PRECISION NOT NULL DEFAULT 0,
+  n_gpa_american_fall2025 BIGINT NOT NULL DEFAULT 0,
+  n_accepted_fall2025 BIGINT NOT NULL DEFAULT 0,
+  sum_gpa_accepted_fall2025 DOUBLE PRECISION NOT NULL DEFAULT 0,
+  n_gpa_accepted_fall2025 BIGINT NOT NULL DEFAULT 0,
+  jhu_ms_cs_count BIGINT NOT NULL DEFAULT 0,
+  gtown_cs_phd_2025_accepts BIGINT NOT NULL DEFAULT 0,
+  ds_fall2025_count BIGINT NOT NULL DEFAULT 0,
+  gre_submitters_count BIGINT NOT NULL DEFAULT 0,
+  rebuilt_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ
+);
+INSERT INTO applicant_summary_counters (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
 
 -- Single-row materialized view with a synthetic primary key (id=1)
--- so we can index it and (optionally) use CONCURRENTLY later.
+-- so we can index it and refresh it CONCURRENTLY (readers are never blocked).
+-- Created WITH NO DATA: it stays unpopulated until the first recompute_analytics,
+-- and the web tier falls back to live queries until then.
 CREATE MATERIALIZED VIEW IF NOT EXISTS applicant_summary AS
 SELECT
   1 AS id,
   -- 1) How many applied for Fall 2025
-  (SELECT COUNT(*) FROM applicants WHERE term ILIKE '%Fall 2025%') AS fall2025_count,
+  (SELECT COUNT(*) FROM applicants WHERE term_year = 2025 AND term_season = 'fall') AS fall2025_count,
 
   -- 2) Percent of international students
   (SELECT ROUND(
@@ -40,55 +175,54 @@ SELECT
 
   -- 4) Avg GPA of American students in Fall 2025
   (SELECT AVG(gpa) FROM applicants
-     WHERE term = 'Fall 2025' AND us_or_international = 'American' AND gpa IS NOT NULL
+     WHERE term_year = 2025 AND term_season = 'fall'
+       AND us_or_international = 'American' AND gpa IS NOT NULL
   ) AS avg_gpa_american_fall2025,
 
   -- 5) Percent acceptances for Fall 2025
-  (SELECT 100.0 * COUNT(*) FILTER (WHERE status ILIKE 'Accepted%') / NULLIF(COUNT(*), 0)
-     FROM applicants WHERE term = 'Fall 2025'
+  (SELECT 100.0 * COUNT(*) FILTER (WHERE status_kind = 'accepted') / NULLIF(COUNT(*), 0)
+     FROM applicants WHERE term_year = 2025 AND term_season = 'fall'
   ) AS pct_accept_fall2025,
 
   -- 6) Avg GPA of accepted Fall 2025
   (SELECT AVG(gpa) FROM applicants
-     WHERE term = 'Fall 2025' AND status ILIKE '%Accepted%' AND gpa IS NOT NULL
+     WHERE term_year = 2025 AND term_season = 'fall'
+       AND status_kind = 'accepted' AND gpa IS NOT NULL
   ) AS avg_gpa_accepted_fall2025,
 
   -- 7) JHU MS CS applicants
   (SELECT COUNT(*) FROM applicants
      WHERE (
-       llm_generated_university ILIKE '%Johns Hopkins%' OR
-       llm_generated_university ILIKE '%JHU%' OR
-       llm_generated_university ILIKE '%Hopkins%'
+       llm_generated_university ILIKE '%Hopkins%' OR
+       llm_generated_university ILIKE '%JHU%'
      )
      AND llm_generated_program ILIKE '%Computer Science%'
-     AND (
-       degree ILIKE '%Master%' OR degree ILIKE '%MS%' OR
-       degree ILIKE '%M.S.%'  OR degree ILIKE '%Masters%'
-     )
+     AND degree_level = 'masters'
   ) AS jhu_ms_cs_count,
 
   -- 8) 2025 Georgetown CS PhD acceptances
   (SELECT COUNT(*) FROM applicants
-     WHERE term ILIKE '%2025%'
-       AND status ILIKE '%Accept%'
+     WHERE term_year = 2025
+       AND status_kind = 'accepted'
        AND llm_generated_university ILIKE '%Georgetown%'
-       AND (
-         degree ILIKE '%PhD%' OR degree ILIKE '%Ph.D.%' OR degree ILIKE '%Doctorate%'
-       )
+       AND degree_level = 'phd'
        AND llm_generated_program ILIKE '%Computer Science%'
   ) AS gtown_cs_phd_2025_accepts,
 
   -- 9) Fall 2025 Data Science applicants
   (SELECT COUNT(*) FROM applicants
-     WHERE term ILIKE '%Fall 2025%'
+     WHERE term_year = 2025 AND term_season = 'fall'
        AND llm_generated_program ILIKE '%Data Science%'
   ) AS ds_fall2025_count,
 
   -- 10) Number of applicants who submitted any GRE component
   (SELECT COUNT(*) FROM applicants
      WHERE gre IS NOT NULL OR gre_v IS NOT NULL OR gre_aw IS NOT NULL
-  ) AS gre_submitters_count
-;
+  ) AS gre_submitters_count,
+
+  -- When this snapshot was taken (shown on the dashboard as its staleness)
+  now() AS refreshed_at
+WITH NO DATA;
 
--- Unique index so we can optionally REFRESH CONCURRENTLY:
+-- Unique index required by REFRESH ... CONCURRENTLY (used by the worker once populated):
 CREATE UNIQUE INDEX IF NOT EXISTS applicant_summary_pk ON applicant_summary(id);
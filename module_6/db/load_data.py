@@ -1,11 +1,23 @@
 """Load cleaned and standardized GradCafe applicant data into the PostgreSQL database."""
 
 import os
+import sys
 import json
+import time
 import psycopg
 from psycopg import sql
 import re
 
+# Row normalization is shared with the worker (etl/normalize.py). In the worker
+# image this file runs from /app/db next to /app/etl; in the repo etl/ is under worker/.
+_HERE = os.path.dirname(os.path.abspath(__file__))
+for _root in (os.path.join(_HERE, ".."), os.path.join(_HERE, "..", "worker")):
+    if os.path.isdir(os.path.join(_root, "etl")):
+        sys.path.insert(0, _root)
+        break
+
+from etl.normalize import APPLICANT_COLUMNS, FIELDS, iter_rows  # pylint: disable=wrong-import-position
+
 DEFAULT_FILE = "/app/data/full_out.jsonl"
 
 def _iter_records(file_path):
@@ -21,19 +33,23 @@ def ensure_watermark_table(cur):
         CREATE TABLE IF NOT EXISTS ingestion_watermarks (
             source TEXT PRIMARY KEY,
             last_seen TEXT,
+            last_offset BIGINT,
             updated_at TIMESTAMPTZ DEFAULT now()
         );
     """)
+    cur.execute("ALTER TABLE ingestion_watermarks ADD COLUMN IF NOT EXISTS last_offset BIGINT")
 
-def to_float(v):
-    """Return a float or None from messy numeric strings like '3.9', '320', '160/170', '4.5 (AW)', 'N/A'."""
-    if v in (None, "", "N/A"):
-        return None
-    if isinstance(v, (int, float)):
-        return float(v)
-    s = str(v).strip()
-    m = re.search(r'[-+]?\d*\.?\d+', s)  # first number in the string
-    return float(m.group()) if m else None
+def ensure_analytics_state(cur):
+    """Create the one-row analytics_state table the recompute job compares versions in."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS analytics_state (
+            id INT PRIMARY KEY CHECK (id = 1),
+            data_version BIGINT NOT NULL DEFAULT 0,
+            refreshed_version BIGINT,
+            refreshed_at TIMESTAMPTZ
+        );
+    """)
+    cur.execute("INSERT INTO analytics_state (id) VALUES (1) ON CONFLICT (id) DO NOTHING")
 
 # pylint: disable=no-member
 
@@ -45,8 +61,264 @@ DB_PORT = int(os.getenv("POSTGRES_PORT", "5432"))
 
 DEFAULT_FILE = "/app/data/full_out.jsonl"
 
-def load_data_from_jsonl(file_path=DEFAULT_FILE):
-    """Truncate the applicants table and load all rows from the given JSONL file."""
+# "insert": one INSERT round trip per line. "copy": stream rows with COPY (see load_records).
+LOAD_MODE = os.getenv("LOAD_MODE", "insert")
+
+# Binary COPY sends typed values, so every column's Postgres type is spelled out
+# (in APPLICANT_COLUMNS order, from the kind etl/normalize.py parses it as).
+COPY_TYPES = tuple(
+    {"text": "text", "float": "float8", "date": "date", "year": "int4"}[kind]
+    for _, _, kind in FIELDS
+)
+
+def _insert_rows(cur, records, table):
+    """Insert row by row; returns (rows seen, rows inserted)."""
+    insert_stmt = sql.SQL("""
+        INSERT INTO {tbl} ({cols})
+        VALUES ({vals})
+        ON CONFLICT (url, term_year) DO NOTHING
+    """).format(
+        tbl=sql.Identifier(table),
+        cols=sql.SQL(", ").join(map(sql.Identifier, APPLICANT_COLUMNS)),
+        vals=sql.SQL(", ").join(sql.Placeholder() * len(APPLICANT_COLUMNS)),
+    )
+    seen = inserted = 0
+    for row in iter_rows(records):
+        cur.execute(insert_stmt, row)
+        seen += 1
+        inserted += cur.rowcount
+    return seen, inserted
+
+def _copy_rows(cur, records, table):
+    """COPY into a temp stage, then one INSERT ... SELECT; returns (seen, inserted).
+
+    The stage keeps file order (ord) and the INSERT consumes it in that order
+    with the same ON CONFLICT clause, so the first line for a (url, term_year)
+    wins and ids are assigned exactly as the row-by-row path assigns them.
+    """
+    cols = sql.SQL(", ").join(map(sql.Identifier, APPLICANT_COLUMNS))
+    defs = sql.SQL(", ").join(
+        sql.SQL("{} {}").format(sql.Identifier(c), sql.SQL(t))
+        for c, t in zip(APPLICANT_COLUMNS, COPY_TYPES)
+    )
+    cur.execute(sql.SQL(
+        "CREATE TEMP TABLE applicants_load (ord BIGINT, {defs}) ON COMMIT DROP"
+    ).format(defs=defs))
+    seen = 0
+    copy_stmt = sql.SQL(
+        "COPY applicants_load (ord, {cols}) FROM STDIN (FORMAT BINARY)"
+    ).format(cols=cols)
+    with cur.copy(copy_stmt) as copy:
+        copy.set_types(("int8",) + COPY_TYPES)
+        for row in iter_rows(records):
+            copy.write_row((seen,) + row)
+            seen += 1
+    cur.execute(sql.SQL("""
+        INSERT INTO {tbl} ({cols})
+        SELECT {cols} FROM applicants_load ORDER BY ord
+        ON CONFLICT (url, term_year) DO NOTHING
+    """).format(tbl=sql.Identifier(table), cols=cols))
+    return seen, cur.rowcount
+
+# --- Shadow-table reload
+# A full reload builds applicants_new (and applicant_summary_new over it) next to
+# the live table, then swaps names in one short transaction. Readers keep seeing
+# the old rows until the swap commits; queries queued behind the swap's lock
+# re-resolve "applicants" to the new table. Every shadow object is named
+# <live name>_new and renamed back once the old objects are dropped.
+
+SHADOW = "applicants_new"
+SUMMARY = "applicant_summary"
+
+# The swap waits at most this long for in-flight reads, then retries, so a slow
+# reader cannot park every other query behind the swap's lock queue.
+SWAP_LOCK_TIMEOUT = os.getenv("SWAP_LOCK_TIMEOUT", "2s")
+SWAP_ATTEMPTS = int(os.getenv("SWAP_ATTEMPTS", "10"))
+
+def _partitions(cur):
+    """(name, bound) for every partition of applicants.
+
+    e.g. ('applicants_2025', 'FOR VALUES FROM (2025) TO (2026)').
+    """
+    cur.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'applicants'::regclass
+        ORDER BY c.relname
+    """)
+    return cur.fetchall()
+
+def _key_constraints(cur):
+    """(name, definition) of applicants' primary key and unique constraints."""
+    cur.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = 'applicants'::regclass AND contype IN ('p', 'u')
+        ORDER BY conname
+    """)
+    return cur.fetchall()
+
+def _secondary_indexes(cur):
+    """(name, CREATE INDEX ...) for applicants' indexes that no constraint needs."""
+    cur.execute("""
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = 'applicants'::regclass
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.oid)
+        ORDER BY i.relname
+    """)
+    return cur.fetchall()
+
+def _partition_index_names(cur):
+    """(shadow, live) names for the indexes Postgres created on each shadow partition.
+
+    applicants_2025_new's indexes are auto-named applicants_2025_new_..., so
+    they are renamed with their partition to keep names stable across reloads.
+    """
+    cur.execute("""
+        SELECT p.relname, i.relname
+        FROM pg_inherits h
+        JOIN pg_class p ON p.oid = h.inhrelid
+        JOIN pg_index x ON x.indrelid = p.oid
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE h.inhparent = to_regclass(%s)
+        ORDER BY i.relname
+    """, (SHADOW,))
+    return [
+        (index, partition[:-len("_new")] + index[len(partition):])
+        for partition, index in cur.fetchall()
+        if index.startswith(partition)
+    ]
+
+def _summary_definition(cur):
+    """(SELECT text, populated) of the applicant_summary view, or None if there is none."""
+    cur.execute("""
+        SELECT pg_get_viewdef(v.oid), v.relispopulated
+        FROM pg_class v
+        JOIN pg_class t ON t.oid = 'applicants'::regclass
+        WHERE v.relname = %s AND v.relkind = 'm' AND v.relnamespace = t.relnamespace
+    """, (SUMMARY,))
+    return cur.fetchone()
+
+def build_shadow(cur, records, mode=None):
+    """Load ``records`` into applicants_new, fully indexed; returns (renames, seen, inserted).
+
+    ``renames`` lists the (ALTER keyword, shadow name, live name) pairs the
+    swap must apply. The table, partitions and keys are cloned from the live
+    catalog, so the shadow always matches what db/init.sql created. Secondary
+    indexes are built once after the load ("copy" mode streams the rows with
+    COPY instead of one INSERT per line), and the table is analyzed before it
+    goes live so the first dashboard queries get good plans.
+    """
+    mode = mode or LOAD_MODE
+    if mode not in ("insert", "copy"):
+        raise ValueError(f"unknown load mode: {mode!r}")
+
+    shadow = sql.Identifier(SHADOW)
+    renames = []
+    # Leftovers of an interrupted reload
+    cur.execute(sql.SQL("DROP MATERIALIZED VIEW IF EXISTS {}").format(
+        sql.Identifier(SUMMARY + "_new")))
+    cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(shadow))
+
+    # --- Step 1: Empty shadow table with the live columns, keys and partitions.
+    # INCLUDING DEFAULTS keeps id on applicants_id_seq, so ids keep counting up.
+    cur.execute(sql.SQL("""
+        CREATE TABLE {} (LIKE applicants INCLUDING DEFAULTS INCLUDING GENERATED)
+        PARTITION BY RANGE (term_year)
+    """).format(shadow))
+    for name, definition in _key_constraints(cur):
+        cur.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(
+            shadow, sql.Identifier(name + "_new"), sql.SQL(definition)))
+        renames.append(("INDEX", name + "_new", name))
+    for name, bound in _partitions(cur):
+        cur.execute(sql.SQL("CREATE TABLE {} PARTITION OF {} {}").format(
+            sql.Identifier(name + "_new"), shadow, sql.SQL(bound)))
+        renames.append(("TABLE", name + "_new", name))
+
+    # --- Step 2: Load rows
+    load = _copy_rows if mode == "copy" else _insert_rows
+    seen, inserted = load(cur, records, SHADOW)
+
+    # --- Step 3: Build the secondary indexes once, over the loaded rows
+    for name, ddl in _secondary_indexes(cur):
+        ddl = ddl.replace(f"INDEX {name} ", f"INDEX {name}_new ", 1)
+        cur.execute(re.sub(r" ON (ONLY )?\S+ USING ", f" ON {SHADOW} USING ", ddl, count=1))
+        renames.append(("INDEX", name + "_new", name))
+    renames.extend(("INDEX", index, live) for index, live in _partition_index_names(cur))
+    cur.execute(sql.SQL("ANALYZE {}").format(shadow))
+
+    # --- Step 4: Summary view over the shadow, populated if the live one is
+    summary = _summary_definition(cur)
+    if summary is not None:
+        select, populated = summary
+        select = re.sub(r"\bapplicants\b", SHADOW, select.strip().rstrip(";"))
+        cur.execute(sql.SQL("CREATE MATERIALIZED VIEW {} AS {} {}").format(
+            sql.Identifier(SUMMARY + "_new"), sql.SQL(select),
+            sql.SQL("WITH DATA" if populated else "WITH NO DATA")))
+        cur.execute(sql.SQL("CREATE UNIQUE INDEX {} ON {} (id)").format(
+            sql.Identifier(SUMMARY + "_pk_new"), sql.Identifier(SUMMARY + "_new")))
+        renames.append(("INDEX", SUMMARY + "_pk_new", SUMMARY + "_pk"))
+    return renames, seen, inserted
+
+def swap_shadow(cur, renames):
+    """Replace applicants (and applicant_summary) with the shadow objects; catalog-only.
+
+    Runs in the caller's transaction, which should be short: from the first
+    RENAME until commit, readers of applicants queue behind its lock.
+    """
+    cur.execute(sql.SQL("SET LOCAL lock_timeout = {}").format(sql.Literal(SWAP_LOCK_TIMEOUT)))
+    has_summary = any(live == SUMMARY + "_pk" for _, _, live in renames)
+    cur.execute("ALTER TABLE applicants RENAME TO applicants_old")
+    cur.execute(sql.SQL("ALTER TABLE {} RENAME TO applicants").format(sql.Identifier(SHADOW)))
+    if has_summary:
+        cur.execute(sql.SQL("ALTER MATERIALIZED VIEW {} RENAME TO {}").format(
+            sql.Identifier(SUMMARY), sql.Identifier(SUMMARY + "_old")))
+        cur.execute(sql.SQL("ALTER MATERIALIZED VIEW {} RENAME TO {}").format(
+            sql.Identifier(SUMMARY + "_new"), sql.Identifier(SUMMARY)))
+        cur.execute(sql.SQL("DROP MATERIALIZED VIEW {}").format(sql.Identifier(SUMMARY + "_old")))
+    # The shared id sequence must outlive the old table.
+    cur.execute("ALTER SEQUENCE applicants_id_seq OWNED BY applicants.id")
+    # No CASCADE: an unexpected dependent fails the swap instead of being dropped.
+    cur.execute("DROP TABLE applicants_old")
+    for kind, shadow, live in renames:
+        cur.execute(sql.SQL("ALTER " + kind + " {} RENAME TO {}").format(
+            sql.Identifier(shadow), sql.Identifier(live)))
+    # Scrapes that committed while the shadow was built are gone with the old
+    # table; rewind their watermarks so the next scrape rereads the data file
+    # from the top and ON CONFLICT keeps only what the reload did not cover.
+    cur.execute("""
+        UPDATE ingestion_watermarks
+        SET last_seen = NULL, last_offset = NULL, updated_at = now()
+    """)
+
+def load_records(cur, records, mode=None):
+    """Reload applicants from ``records`` via a shadow table; returns (rows seen, rows inserted).
+
+    Builds and commits the shadow, then swaps it in, retrying when the swap
+    times out waiting for readers. The swap transaction is left open so the
+    caller can commit its own bookkeeping atomically with it. Rows ingested
+    into the live table while the shadow is built are dropped with it, and
+    the swap rewinds the scrape watermarks so they are ingested again.
+    """
+    conn = cur.connection
+    renames, seen, inserted = build_shadow(cur, records, mode)
+    conn.commit()
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        try:
+            swap_shadow(cur, renames)
+            return seen, inserted
+        except psycopg.errors.LockNotAvailable:
+            conn.rollback()
+            print(f"swap attempt {attempt} timed out waiting for readers; retrying", flush=True)
+            time.sleep(min(attempt, 5))
+    raise RuntimeError(
+        f"could not swap in {SHADOW} after {SWAP_ATTEMPTS} attempts; it is left in place")
+
+def load_data_from_jsonl(file_path=DEFAULT_FILE, mode=None):
+    """Reload the applicants table from the given JSONL file without emptying it for readers."""
 
     conn = psycopg.connect(  # pylint: disable=no-member
         dbname=DB_NAME,
@@ -58,76 +330,27 @@ def load_data_from_jsonl(file_path=DEFAULT_FILE):
     cur = conn.cursor() # pylint: disable=no-member
 
     ensure_watermark_table(cur)
+    ensure_analytics_state(cur)
+    conn.commit()
 
-    # --- Step 1: Clear old data
-    truncate_stmt = sql.SQL("TRUNCATE TABLE {tbl}").format(
-        tbl=sql.Identifier("applicants")
-    )
-    cur.execute(truncate_stmt)
-
-    # --- Step 2: Prepare INSERT statement
-    insert_stmt = sql.SQL("""
-        INSERT INTO {tbl} (
-            program, degree, comments, date_added, status, url,
-            gpa, gre, gre_v, gre_aw, term, us_or_international,
-            llm_generated_program, llm_generated_university, university
-        )
-        VALUES (
-            {program}, {degree}, {comments}, {date_added}, {status}, {url},
-            {gpa}, {gre}, {gre_v}, {gre_aw}, {term}, {us_or_international},
-            {llm_prog}, {llm_uni}, {university}
-        )
-        ON CONFLICT (url) DO NOTHING
-    """).format(
-        tbl=sql.Identifier("applicants"),
-        program=sql.Placeholder(),
-        degree=sql.Placeholder(),
-        comments=sql.Placeholder(),
-        date_added=sql.Placeholder(),
-        status=sql.Placeholder(),
-        url=sql.Placeholder(),
-        gpa=sql.Placeholder(),
-        gre=sql.Placeholder(),
-        gre_v=sql.Placeholder(),
-        gre_aw=sql.Placeholder(),
-        term=sql.Placeholder(),
-        us_or_international=sql.Placeholder(),
-        llm_prog=sql.Placeholder(),
-        llm_uni=sql.Placeholder(),
-        university=sql.Placeholder(),
-    )
-
-    # --- Step 3: Helper for cleaning values
-    def clean_val(v):
-        return None if v in ("N/A", "", None) else v
+    start = time.perf_counter()
+    seen, inserted = load_records(cur, _iter_records(file_path), mode)
 
-    # --- Step 4: Insert rows
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            entry = json.loads(line)
-
-            cur.execute(
-                insert_stmt,
-                (
-                    clean_val(entry.get("program")),
-                    clean_val(entry.get("degree_type")),
-                    clean_val(entry.get("comments")),
-                    clean_val(entry.get("date_added")),
-                    clean_val(entry.get("status")),
-                    clean_val(entry.get("url")),
-                    to_float(entry.get("GPA")),
-                    to_float(entry.get("GRE_G")),
-                    to_float(entry.get("GRE_V")),
-                    to_float(entry.get("GRE_AW")),
-                    clean_val(entry.get("term")),
-                    clean_val(entry.get("US/International")),
-                    clean_val(entry.get("llm-generated-program")),
-                    clean_val(entry.get("llm-generated-university")),
-                    clean_val(entry.get("university")),
-                )
-            )
+    # --- Step 5: The table was replaced, so the next recompute must refresh
+    cur.execute("UPDATE analytics_state SET data_version = data_version + 1 WHERE id = 1")
+    # ... and reseed the ingest-maintained counters, which no longer match
+    cur.execute("""
+        DO $$ BEGIN
+            IF to_regclass('applicant_summary_counters') IS NOT NULL THEN
+                UPDATE applicant_summary_counters SET rebuilt_at = NULL WHERE id = 1;
+            END IF;
+        END $$
+    """)
 
     conn.commit()
+    elapsed = time.perf_counter() - start
+    print(f"loaded {inserted:,} of {seen:,} rows in {elapsed:.1f}s "
+          f"({seen / max(elapsed, 1e-9):,.0f} rows/s, mode={mode or LOAD_MODE})", flush=True)
     cur.close()
     conn.close()
 
@@ -0,0 +1,68 @@
+"""Tests for etl/append_data.py against a fake psycopg connection."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "worker"))
+
+from etl import append_data  # pylint: disable=import-error, wrong-import-position
+
+
+class FakeCursor:
+    """Records statements; executemany reports ``new`` rows as inserted."""
+
+    def __init__(self, new):
+        self.new = new
+        self.queries = []
+        self.rowcount = -1
+
+    def executemany(self, query, rows):
+        """Record the batch."""
+        self.queries.append(query)
+        self.rowcount = min(self.new, len(rows))
+
+    def execute(self, query):
+        """Record a statement."""
+        self.queries.append(query)
+
+    def close(self):
+        """Nothing to release."""
+
+
+class FakeConn:
+    """Hands out one FakeCursor and counts commits."""
+
+    def __init__(self, new):
+        self.cur = FakeCursor(new)
+        self.commits = 0
+
+    def cursor(self):
+        """Return the shared cursor."""
+        return self.cur
+
+    def commit(self):
+        """Count a commit."""
+        self.commits += 1
+
+    def close(self):
+        """Nothing to release."""
+
+
+@pytest.mark.load
+@pytest.mark.parametrize("new, marked", [(1, True), (0, False)])
+def test_append_marks_analytics_stale_only_when_rows_inserted(monkeypatch, tmp_path, new, marked):
+    """New rows bump data_version and reseed the counters in the insert's transaction."""
+    path = tmp_path / "full_out.jsonl"
+    path.write_text(json.dumps({"url": "u1", "term": "Fall 2025"}) + "\n", encoding="utf-8")
+    conn = FakeConn(new)
+    monkeypatch.setattr(append_data.psycopg, "connect", lambda dsn: conn)
+
+    assert append_data.append_data(str(path)) == 1
+
+    marks = [q for q in conn.cur.queries if "data_version + 1" in q]
+    assert bool(marks) is marked and conn.commits == 1
+    if marked:
+        assert "rebuilt_at = NULL" in marks[0]
@@ -0,0 +1,488 @@
+"""Tests for the worker consumer's database helpers."""
+
+import json
+import os
+import queue
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "worker"))
+
+import consumer  # pylint: disable=import-error, wrong-import-position
+
+
+class FakeCopy:
+    """Collects rows written through cursor.copy()."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def write_row(self, row):
+        """Record one staged row."""
+        self.sink.append(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeCursor:
+    """Records statements and COPY rows; fetchone() returns preset rows in order."""
+
+    def __init__(self, rows=()):
+        self.queries = []
+        self.copied = []
+        self.rows = list(rows)
+
+    def fetchone(self):
+        """Return the next preset row."""
+        return self.rows.pop(0)
+
+    def execute(self, query, params=None):
+        """Record the executed query and parameters."""
+        self.queries.append((query, params))
+
+    def copy(self, statement):
+        """Start a fake COPY FROM STDIN."""
+        self.queries.append((statement, None))
+        return FakeCopy(self.copied)
+
+
+def _row(url):
+    row = {c: None for c in consumer.APPLICANT_COLUMNS}
+    row.update(url=url, program="CS", gpa=3.9)
+    return row
+
+
+@pytest.mark.db
+def test_batch_insert_streams_rows_with_copy():
+    """Rows are staged via COPY and moved with one set-based INSERT."""
+    cur = FakeCursor(rows=[(2,)])
+
+    inserted = consumer._insert_applicants_batch(  # pylint: disable=protected-access
+        cur, (_row(f"https://x/result/{i}") for i in range(3))
+    )
+
+    assert inserted == 2  # true inserted count, not the 3 attempted
+    assert len(cur.copied) == 3
+    assert cur.copied[0][0] == 0 and cur.copied[2][6] == "https://x/result/2"
+    inserts = [q for q, _ in cur.queries if "INSERT INTO applicants" in q]
+    assert len(inserts) == 1
+    assert "ON CONFLICT (url, term_year) DO NOTHING" in inserts[0]
+
+
+@pytest.mark.db
+def test_batch_insert_adds_inserted_rows_to_summary_counters():
+    """The same statement adds the aggregate of the inserted rows to every counter."""
+    cur = FakeCursor(rows=[(1,)])
+    consumer._insert_applicants_batch(cur, [_row("u1")])  # pylint: disable=protected-access
+
+    statement = cur.queries[-1][0]
+    assert "RETURNING" in statement
+    for name, _ in consumer.SUMMARY_COUNTERS:
+        assert f"{name} = c.{name} + delta.{name}" in statement
+    assert "rebuilt_at IS NOT NULL" in statement  # unseeded counters wait for the rebuild
+
+
+@pytest.mark.db
+def test_batch_insert_empty_skips_insert():
+    """An empty batch does not run the INSERT ... SELECT."""
+    cur = FakeCursor()
+
+    assert consumer._insert_applicants_batch(cur, []) == 0  # pylint: disable=protected-access
+    assert not any("INSERT INTO applicants" in q for q, _ in cur.queries)
+
+
+class FakeJobConn:
+    """Autocommit connection stand-in that records job UPDATEs."""
+
+    def __init__(self):
+        self.updates = []
+        self.closed = False
+
+    def execute(self, query, params):
+        """Record an UPDATE statement."""
+        self.updates.append((query, params))
+
+    def close(self):
+        """Mark closed."""
+        self.closed = True
+
+
+@pytest.mark.db
+def test_job_tracker_records_lifecycle():
+    """start/progress/finish update the jobs row on one connection, then close it."""
+    conn = FakeJobConn()
+    job = consumer.JobTracker(12, opener=lambda: conn, min_interval=3600)
+
+    job.start()
+    job.progress(1000)
+    job.progress(2000)  # throttled
+    job.finish("succeeded", rows_seen=2500, rows_inserted=2400)
+
+    assert len(conn.updates) == 3
+    assert "status = 'running'" in conn.updates[0][0]
+    assert conn.updates[1][1] == (1000, 12)
+    assert conn.updates[2][1] == ("succeeded", None, 2500, 2400, 12)
+    assert job.rows_seen == 2000
+    assert conn.closed
+
+
+@pytest.mark.db
+def test_job_tracker_without_id_is_noop():
+    """Messages without a job_id never open a jobs connection."""
+    def _opener():
+        raise AssertionError("should not connect")
+
+    job = consumer.JobTracker(None, opener=_opener)
+    job.start()
+    job.finish("failed", error="x")
+
+
+@pytest.mark.db
+def test_batch_insert_reports_progress():
+    """The progress callback sees running and final staged counts."""
+    seen = []
+    consumer._insert_applicants_batch(  # pylint: disable=protected-access
+        FakeCursor(rows=[(0,)]), (_row(f"u{i}") for i in range(2500)), progress=seen.append
+    )
+
+    assert seen == [1000, 2000, 2500]
+
+
+class FakeCursorConn:  # pylint: disable=too-few-public-methods
+    """Hands out one FakeCursor as a context manager."""
+
+    def __init__(self, cur):
+        self.cur = cur
+        self.commits = 0
+
+    def commit(self):
+        """Count commits."""
+        self.commits += 1
+
+    def cursor(self):
+        """Return the shared cursor."""
+        conn = self
+
+        class _Ctx:  # pylint: disable=too-few-public-methods
+            def __enter__(self):
+                return conn.cur
+
+            def __exit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+STAMP = "2025-10-01T00:00:00Z"
+
+
+def _refreshed(cur):
+    return any("REFRESH MATERIALIZED VIEW" in q for q, _ in cur.queries)
+
+
+@pytest.mark.db
+def test_recompute_seeds_counters_once():
+    """Unseeded counters get one full rebuild (row locked first), committed before the refresh."""
+    cur = FakeCursor(rows=[(None,), (3, 3)])
+    conn = FakeCursorConn(cur)
+    consumer.handle_recompute_analytics(conn, {}, None, debouncer=consumer.RecomputeDebouncer(0))
+
+    statements = [q for q, _ in cur.queries]
+    lock = next(i for i, q in enumerate(statements) if "FOR UPDATE" in q)
+    rebuild = next(i for i, q in enumerate(statements) if "rebuilt_at, updated_at) =" in q)
+    assert lock < rebuild and "FROM applicants" in statements[rebuild]
+    assert conn.commits == 1
+    assert not _refreshed(cur)  # view already at the current data version
+
+
+@pytest.mark.db
+def test_recompute_skips_when_nothing_ingested():
+    """No new data_version since the last refresh: no REFRESH, no debounce wait."""
+    cur = FakeCursor(rows=[(STAMP,), (7, 7)])
+    debouncer = consumer.RecomputeDebouncer(60, sleep=lambda s: pytest.fail("waited"))
+
+    consumer.handle_recompute_analytics(FakeCursorConn(cur), {}, None, debouncer=debouncer)
+
+    assert not _refreshed(cur)
+
+
+@pytest.mark.db
+def test_recompute_refreshes_and_records_version():
+    """New data (or a never-populated view) refreshes and stores the version re-read after waiting."""
+    for before in [(8, 7), (0, None)]:
+        cur = FakeCursor(rows=[(STAMP,), before, (9, before[1]), (True,)])
+        consumer.handle_recompute_analytics(FakeCursorConn(cur), {}, None,
+                                            debouncer=consumer.RecomputeDebouncer(0))
+
+        assert _refreshed(cur)
+        assert cur.queries[-1][1] == (9,) and "refreshed_version" in cur.queries[-1][0]
+
+
+@pytest.mark.db
+def test_recompute_waits_outside_a_transaction():
+    """The debounce wait starts after a commit; a refresh finished meanwhile elsewhere is not redone."""
+    cur = FakeCursor(rows=[(STAMP,), (8, 7), (9, 9)])
+    conn = FakeCursorConn(cur)
+    commits_at_wait = []
+    debouncer = consumer.RecomputeDebouncer(
+        60, clock=lambda: 0.0, sleep=lambda s: commits_at_wait.append(conn.commits))
+    debouncer.claim()  # a refresh just ran in this worker, so the next claim waits
+
+    consumer.handle_recompute_analytics(conn, {}, None, debouncer=debouncer)
+
+    assert commits_at_wait == [1]
+    assert not _refreshed(cur)
+
+
+@pytest.mark.db
+def test_refresh_is_concurrent_once_populated():
+    """Only the first population (view created WITH NO DATA) takes the blocking refresh."""
+    for populated, expected in [((True,), "REFRESH MATERIALIZED VIEW CONCURRENTLY"),
+                                ((False,), "REFRESH MATERIALIZED VIEW applicant_summary"),
+                                (None, "REFRESH MATERIALIZED VIEW applicant_summary")]:
+        cur = FakeCursor(rows=[populated])
+        consumer._refresh_summary(cur)  # pylint: disable=protected-access
+        assert cur.queries[-1][0].startswith(expected)
+
+
+class _Batch(list):
+    max_seen = None
+    offset = 0
+
+
+@pytest.mark.db
+def test_scrape_bumps_data_version_only_when_rows_inserted(monkeypatch):
+    """The change counter moves only when a scrape actually inserted rows."""
+    scraper = type(sys)("etl.incremental_scraper")
+    scraper.run_scraper = lambda since, offset: _Batch([_row("u1")])
+    monkeypatch.setitem(sys.modules, "etl.incremental_scraper", scraper)
+    monkeypatch.setattr(consumer, "_get_watermark", lambda cur, source: (None, None))
+    job = consumer.JobTracker(None)
+
+    for inserted, bumped in [(1, True), (0, False)]:
+        cur = FakeCursor(rows=[(inserted,)])
+        consumer.handle_scrape_new_data(FakeCursorConn(cur), {}, job)
+        assert any("data_version + 1" in q for q, _ in cur.queries) is bumped
+
+
+@pytest.mark.db
+def test_debouncer_coalesces_and_spaces_refreshes():
+    """Callers during a pending wait are coalesced; refreshes are a window apart."""
+    now = [100.0]
+    slept, inner = [], []
+
+    def _sleep(seconds):
+        slept.append(seconds)
+        inner.append(debouncer.claim())  # arrives while the first caller waits
+        now[0] += seconds
+
+    debouncer = consumer.RecomputeDebouncer(5, clock=lambda: now[0], sleep=_sleep)
+
+    assert debouncer.claim()      # first refresh: nothing to wait for
+    assert not slept
+    now[0] += 2
+    assert debouncer.claim()      # 2s later: waits the remaining 3s
+    assert slept == [3] and inner == [False]
+    now[0] += 10
+    assert debouncer.claim() and slept == [3]
+
+
+class FakeChannel:
+    """Records acks and nacks."""
+
+    def __init__(self):
+        self.acked, self.nacked = [], []
+
+    def basic_ack(self, delivery_tag):
+        """Record an ack."""
+        self.acked.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag, requeue):  # pylint: disable=unused-argument
+        """Record a nack."""
+        self.nacked.append(delivery_tag)
+
+
+class FakeTxConn:
+    """Transaction connection stand-in."""
+
+    def __init__(self):
+        self.committed = self.rolled_back = False
+
+    def commit(self):
+        """Mark committed."""
+        self.committed = True
+
+    def rollback(self):
+        """Mark rolled back."""
+        self.rolled_back = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Method:  # pylint: disable=too-few-public-methods
+    delivery_tag = 1
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("fail", [False, True])
+def test_on_message_finishes_job(monkeypatch, fail):
+    """The job ends succeeded with the handler's counts, or failed with its error."""
+    job_conn = FakeJobConn()
+    monkeypatch.setattr(consumer, "_open_jobs_db", lambda: job_conn)
+    monkeypatch.setattr(consumer, "_open_db", FakeTxConn)
+
+    def _handler(conn, payload, job):
+        if fail:
+            raise RuntimeError("boom")
+        return {"rows_seen": 3, "rows_inserted": 2}
+
+    monkeypatch.setattr(consumer, "_task_map", lambda: {"scrape_new_data": _handler})
+    ch = FakeChannel()
+    body = json.dumps({"kind": "scrape_new_data", "payload": {"job_id": 4}}).encode()
+
+    consumer._on_message(ch, _Method(), None, body)  # pylint: disable=protected-access
+
+    final = job_conn.updates[-1][1]
+    if fail:
+        assert final == ("failed", "boom", None, None, 4) and ch.nacked == [1]
+    else:
+        assert final == ("succeeded", None, 3, 2, 4) and ch.acked == [1]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("body, error", [
+    ({"kind": "nope", "payload": {"job_id": 4}}, "unknown kind: nope"),
+    ({"kind": "scrape_new_data", "payload": {"job_id": 4}}, "dispatch error: db down"),
+])
+def test_dispatch_errors_fail_the_job(monkeypatch, body, error):
+    """An unknown kind or an unreachable database nacks and marks the job failed."""
+    job_conn = FakeJobConn()
+    monkeypatch.setattr(consumer, "_open_jobs_db", lambda: job_conn)
+
+    def _db_down():
+        raise OSError("db down")
+
+    monkeypatch.setattr(consumer, "_open_db", _db_down)
+    ch = FakeChannel()
+
+    consumer._on_message(ch, _Method(), None, json.dumps(body).encode())  # pylint: disable=protected-access
+
+    assert job_conn.updates[-1][1] == ("failed", error, None, None, 4) and ch.nacked == [1]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("body", [b"{not json", b"[1, 2]", b'{"kind": "x", "payload": [4]}'])
+def test_malformed_messages_are_dropped(body):
+    """Bodies that are not a task object are nacked without running anything."""
+    assert consumer._process(body) is False  # pylint: disable=protected-access
+
+
+class FakeIOConnection:
+    """Queues add_callback_threadsafe callbacks for the test to run as the I/O thread."""
+
+    def __init__(self):
+        self.callbacks = queue.Queue()
+
+    def add_callback_threadsafe(self, callback):
+        """Queue a callback from a worker thread."""
+        self.callbacks.put(callback)
+
+    def run_next(self):
+        """Run one queued callback, waiting for a worker to post it."""
+        self.callbacks.get(timeout=5)()
+
+
+def _msg(kind, n):
+    return json.dumps({"kind": kind, "payload": {"n": n}}).encode()
+
+
+class _Delivery:  # pylint: disable=too-few-public-methods
+    def __init__(self, tag):
+        self.delivery_tag = tag
+
+
+@pytest.mark.db
+def test_concurrent_consumer_respects_kind_limits():
+    """A long scrape does not block recomputes; a second scrape waits for the first."""
+    release = {"scrape_new_data": threading.Event()}
+    started = []
+
+    def _process(body):
+        msg = json.loads(body)
+        started.append((msg["kind"], msg["payload"]["n"]))
+        if msg["kind"] in release:
+            release[msg["kind"]].wait(5)
+        return msg["payload"]["n"] != 99
+
+    conn, ch = FakeIOConnection(), FakeChannel()
+    worker = consumer.ConcurrentConsumer(conn, threads=4,
+                                         kind_limits={"scrape_new_data": 1}, process=_process)
+    worker.on_message(ch, _Delivery(1), None, _msg("scrape_new_data", 1))
+    worker.on_message(ch, _Delivery(2), None, _msg("scrape_new_data", 2))
+    worker.on_message(ch, _Delivery(3), None, _msg("recompute_analytics", 3))
+    worker.on_message(ch, _Delivery(4), None, _msg("recompute_analytics", 99))
+
+    conn.run_next()
+    conn.run_next()
+    assert sorted(ch.acked + ch.nacked) == [3, 4]  # recomputes finished while scrape 1 runs
+    assert ch.nacked == [4]
+    assert ("scrape_new_data", 2) not in started
+
+    release["scrape_new_data"].set()
+    conn.run_next()
+    conn.run_next()
+    assert ch.acked == [3, 1, 2]
+    assert [n for kind, n in started if kind == "scrape_new_data"] == [1, 2]
+    worker.close()
+
+
+@pytest.mark.db
+def test_kind_limits_parse():
+    """WORKER_KIND_LIMITS is a comma-separated kind=n list."""
+    assert consumer._kind_limits("scrape_new_data=1, recompute_analytics=3") == {  # pylint: disable=protected-access
+        "scrape_new_data": 1, "recompute_analytics": 3,
+    }
+    assert consumer._kind_limits("") == {}  # pylint: disable=protected-access
+
+
+@pytest.mark.db
+def test_worker_kinds_select_queues():
+    """A worker consumes its kinds' queues; only one asked to also drains the legacy queue."""
+    assert consumer._queues_for(consumer._worker_kinds("recompute_analytics")) == [  # pylint: disable=protected-access
+        "tasks_q.recompute_analytics",
+    ]
+    assert consumer._queues_for(consumer._worker_kinds("")) == [  # pylint: disable=protected-access
+        "tasks_q.scrape_new_data", "tasks_q.recompute_analytics",
+    ]
+    assert consumer._queues_for(consumer._worker_kinds("scrape_new_data"), drain_legacy=True) == [  # pylint: disable=protected-access
+        "tasks_q.scrape_new_data", consumer.QUEUE,
+    ]
+    assert consumer._drain_legacy("1") and not consumer._drain_legacy("")  # pylint: disable=protected-access
+    with pytest.raises(ValueError):
+        consumer._worker_kinds("nope")  # pylint: disable=protected-access
+
+
+@pytest.mark.db
+def test_acks_go_back_on_the_delivering_channel():
+    """With one channel per queue, each message is settled on the channel it came from."""
+    conn = FakeIOConnection()
+    scrape_ch, recompute_ch = FakeChannel(), FakeChannel()
+    worker = consumer.ConcurrentConsumer(conn, threads=2, kind_limits={}, process=lambda body: True)
+
+    worker.on_message(scrape_ch, _Delivery(1), None, _msg("scrape_new_data", 1))
+    worker.on_message(recompute_ch, _Delivery(1), None, _msg("recompute_analytics", 2))
+    conn.run_next()
+    conn.run_next()
+
+    assert scrape_ch.acked == [1] and recompute_ch.acked == [1]
+    worker.close()
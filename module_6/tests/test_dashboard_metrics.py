@@ -0,0 +1,176 @@
+"""Tests for the single-pass dashboard aggregate shared by run.py and query_data.py."""
+
+import contextlib
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+from psycopg import errors
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import run  # pylint: disable=import-error, wrong-import-position
+import sql_helpers  # pylint: disable=import-error, wrong-import-position
+from worker.etl import query_data  # pylint: disable=import-error, wrong-import-position
+
+FAKE_ROW = (12, 40.5, 3.6, 320.0, 158.0, 4.1, 3.7, 55.5, 3.8, 4, 1, 9, 77)
+
+
+class DummyCursor:
+    """Fake psycopg cursor that records queries and returns preset rows."""
+
+    def __init__(self, row, summary_row=None, summary_error=None, counters_row=None):
+        self.queries = []
+        self.row = row
+        self.summary_row = summary_row
+        self.counters_row = counters_row
+        self.summary_error = summary_error
+        self._last = None
+
+    def execute(self, query, params=None):
+        """Record the executed query and parameters."""
+        self.queries.append((query, params))
+        self._last = query
+        if "applicant_summary" in query and self.summary_error is not None:
+            raise self.summary_error
+
+    def fetchone(self):
+        """Return the counters/summary row for precomputed reads, else the live aggregate row."""
+        if "applicant_summary_counters" in self._last:
+            return self.counters_row
+        if "applicant_summary" in self._last:
+            return self.summary_row
+        return self.row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class DummyConn:
+    """Fake psycopg connection usable as a context manager."""
+
+    def __init__(self, row, **summary):
+        self.cur = DummyCursor(row, **summary)
+
+    def cursor(self):
+        """Return dummy cursor."""
+        return self.cur
+
+    def transaction(self):
+        """Pretend to open a savepoint (noop)."""
+        return contextlib.nullcontext()
+
+    def close(self):
+        """Pretend to close (noop)."""
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.mark.query
+def test_fetch_dashboard_metrics_is_one_query():
+    """All metrics come back from exactly one statement, keyed by template name."""
+    cur = DummyCursor(FAKE_ROW)
+    metrics = sql_helpers.fetch_dashboard_metrics(cur)
+
+    assert len(cur.queries) == 1
+    assert list(metrics) == [key for key, _ in sql_helpers.DASHBOARD_METRICS]
+    assert metrics["count"] == 12
+    assert metrics["count_gre"] == 77
+
+
+@pytest.mark.query
+def test_dashboard_sql_has_every_alias():
+    """Each metric alias is produced by the aggregate (and matches applicant_summary)."""
+    for _, alias in sql_helpers.DASHBOARD_METRICS:
+        assert f"AS {alias}" in sql_helpers.SQL_DASHBOARD_METRICS
+
+
+@pytest.mark.web
+def test_index_falls_back_to_single_live_query(monkeypatch):
+    """With an empty view, the dashboard renders from one live aggregate statement."""
+    conn = DummyConn(FAKE_ROW)
+    monkeypatch.setattr(run, "get_conn", lambda: conn)
+
+    response = run.app.test_client().get("/")
+
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    live = [q for q, _ in conn.cur.queries if "applicant_summary" not in q]
+    assert len(live) == 1
+    assert "Answer: 12" in html
+    assert "showing live data" in html
+
+
+@pytest.mark.web
+def test_index_falls_back_when_view_never_refreshed(monkeypatch):
+    """An unpopulated (WITH NO DATA) view triggers the live fallback."""
+    conn = DummyConn(FAKE_ROW, summary_error=errors.ObjectNotInPrerequisiteState())
+    monkeypatch.setattr(run, "get_conn", lambda: conn)
+
+    response = run.app.test_client().get("/")
+
+    assert response.status_code == 200
+    assert "Answer: 12" in response.get_data(as_text=True)
+
+
+@pytest.mark.web
+def test_index_reads_summary_view(monkeypatch):
+    """A refreshed view is rendered directly, with its refresh timestamp."""
+    stamp = datetime(2025, 10, 1, 12, 30, tzinfo=timezone.utc)
+    summary = (99,) + FAKE_ROW[1:] + (stamp,)
+    conn = DummyConn(FAKE_ROW, summary_row=summary)
+    monkeypatch.setattr(run, "get_conn", lambda: conn)
+
+    response = run.app.test_client().get("/")
+
+    html = response.get_data(as_text=True)
+    assert len(conn.cur.queries) == 2  # unseeded counters, then the view
+    assert "Answer: 99" in html
+    assert "2025-10-01 12:30:00 UTC" in html
+
+
+@pytest.mark.web
+def test_index_prefers_ingest_maintained_counters(monkeypatch):
+    """Seeded counters are read first; neither the view nor applicants is queried."""
+    stamp = datetime(2025, 10, 2, 8, 0, tzinfo=timezone.utc)
+    conn = DummyConn(FAKE_ROW, summary_row=(99,) + FAKE_ROW[1:] + (stamp,),
+                     counters_row=(123,) + FAKE_ROW[1:] + (stamp,))
+    monkeypatch.setattr(run, "get_conn", lambda: conn)
+
+    html = run.app.test_client().get("/").get_data(as_text=True)
+
+    assert len(conn.cur.queries) == 1
+    assert "applicant_summary_counters" in conn.cur.queries[0][0]
+    assert "Answer: 123" in html
+
+
+@pytest.mark.query
+def test_counters_sql_has_every_alias():
+    """The counters read returns every dashboard column, in DASHBOARD_METRICS order."""
+    positions = [sql_helpers.SQL_DASHBOARD_COUNTERS.index(alias)
+                 for _, alias in sql_helpers.DASHBOARD_METRICS]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.query
+def test_query_data_main_single_pass(monkeypatch, capsys):
+    """query_data.main prints every report from one statement."""
+    conn = DummyConn(FAKE_ROW)
+    monkeypatch.setattr(query_data, "get_db_connection", lambda: conn)
+
+    query_data.main()
+
+    out = capsys.readouterr().out
+    assert len(conn.cur.queries) == 1
+    assert "Number of Fall 2025 applicants: 12" in out
+    assert "Percentage of international applicants: 40.50%" in out
+    assert "Number of applicants who submitted a GRE score: 77" in out
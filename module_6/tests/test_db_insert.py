@@ -36,7 +36,7 @@ def test_insert_and_select(db_conn_fixture):
             %s, %s, %s, %s, %s, %s,
             %s, %s, %s
         )
-        ON CONFLICT (url) DO NOTHING
+        ON CONFLICT (url, term_year) DO NOTHING
         """,
         (
             "Computer Science",
@@ -70,7 +70,7 @@ def test_duplicate_insert_is_ignored(db_conn_fixture):
         """
         INSERT INTO applicants (program, degree, comments, date_added, status, url)
         VALUES (%s, %s, %s, %s, %s, %s)
-        ON CONFLICT (url) DO NOTHING
+        ON CONFLICT (url, term_year) DO NOTHING
         """,
         (
             "Data Science",
@@ -86,7 +86,7 @@ def test_duplicate_insert_is_ignored(db_conn_fixture):
         """
         INSERT INTO applicants (program, degree, comments, date_added, status, url)
         VALUES (%s, %s, %s, %s, %s, %s)
-        ON CONFLICT (url) DO NOTHING
+        ON CONFLICT (url, term_year) DO NOTHING
         """,
         (
             "Data Science",
@@ -0,0 +1,154 @@
+"""Tests for background job tracking behind /api/scrape, /api/recompute and /api/jobs."""
+
+import contextlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import run  # pylint: disable=import-error
+import sql_helpers  # pylint: disable=import-error
+
+
+class FakeCursor:
+    """Returns preset rows from fetchone() and records statements."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+
+    def execute(self, query, params=None):
+        """Record the executed query and parameters."""
+        self.queries.append((query, params))
+
+    def fetchone(self):
+        """Return the next preset row."""
+        return self.rows.pop(0) if self.rows else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConn:
+    """Hands out one shared FakeCursor."""
+
+    def __init__(self, cur):
+        self.cur = cur
+
+    def cursor(self):
+        """Return the shared cursor."""
+        return self.cur
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture(name="client")
+def fixture_client(monkeypatch):
+    """Flask test client with the jobs table assumed to exist."""
+    monkeypatch.setattr(run, "_JOBS_READY", True)
+    return run.app.test_client()
+
+
+def _use_cursor(monkeypatch, cur):
+    monkeypatch.setattr(run, "get_conn", lambda: contextlib.nullcontext(FakeConn(cur)))
+
+
+@pytest.mark.buttons
+def test_scrape_creates_job_and_publishes_its_id(client, monkeypatch):
+    """A new scrape gets a job row and the message carries its id."""
+    published = []
+    monkeypatch.setattr(run, "create_job", lambda cur, kind, key, stale: (41, "queued", True))
+    monkeypatch.setattr(run, "publish_task", lambda kind, payload: published.append((kind, payload)))
+    _use_cursor(monkeypatch, FakeCursor())
+
+    response = client.post("/api/scrape")
+
+    assert response.status_code == 202
+    assert response.get_json() == {"status": "queued", "task": "scrape_new_data",
+                                   "job_id": 41, "coalesced": False}
+    assert response.headers["Location"] == "/api/jobs/41"
+    assert published == [("scrape_new_data", {"job_id": 41})]
+
+
+@pytest.mark.buttons
+def test_duplicate_scrape_joins_job_in_flight(client, monkeypatch):
+    """While a scrape is queued/running, another click returns it without publishing."""
+    published = []
+    monkeypatch.setattr(run, "create_job", lambda cur, kind, key, stale: (41, "running", False))
+    monkeypatch.setattr(run, "publish_task", lambda kind, payload: published.append(kind))
+    _use_cursor(monkeypatch, FakeCursor())
+
+    body = client.post("/api/scrape").get_json()
+
+    assert body["job_id"] == 41 and body["coalesced"] and body["status"] == "running"
+    assert not published
+
+
+@pytest.mark.buttons
+def test_publish_failure_marks_job_failed(client, monkeypatch):
+    """If RabbitMQ is down the job is failed so it cannot block later scrapes."""
+    failed = []
+
+    def _boom(kind, payload):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(run, "create_job", lambda cur, kind, key, stale: (5, "queued", True))
+    monkeypatch.setattr(run, "fail_job", lambda cur, job_id, error: failed.append((job_id, error)))
+    monkeypatch.setattr(run, "publish_task", _boom)
+    _use_cursor(monkeypatch, FakeCursor())
+
+    response = client.post("/api/recompute")
+
+    assert response.status_code == 503
+    assert failed == [(5, "publish_failed")]
+
+
+@pytest.mark.buttons
+def test_job_status_reports_counts_and_timings(client, monkeypatch):
+    """GET /api/jobs/<id> returns progress, row counts and durations."""
+    t0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    row = (7, "scrape_new_data", "succeeded", 120, 100, None,
+           t0, t0 + timedelta(seconds=2), t0 + timedelta(seconds=32), t0 + timedelta(seconds=32))
+    _use_cursor(monkeypatch, FakeCursor([row]))
+
+    body = client.get("/api/jobs/7").get_json()
+
+    assert body["status"] == "succeeded"
+    assert body["rows_seen"] == 120 and body["rows_inserted"] == 100
+    assert body["queued_seconds"] == 2.0
+    assert body["run_seconds"] == 30.0
+    assert body["started_at"] == "2025-01-01T00:00:02+00:00"
+
+
+@pytest.mark.buttons
+def test_unknown_job_is_404(client, monkeypatch):
+    """Missing job ids are reported as not found."""
+    _use_cursor(monkeypatch, FakeCursor())
+
+    assert client.get("/api/jobs/999").status_code == 404
+
+
+@pytest.mark.db
+def test_create_job_joins_active_job_on_conflict():
+    """When the INSERT hits the active-job index, the existing job is returned."""
+    cur = FakeCursor([None, (3, "running")])
+
+    assert sql_helpers.create_job(cur, "scrape_new_data", "scrape_new_data") == (3, "running", False)
+    assert cur.queries[0][0].split()[:2] == ["UPDATE", "jobs"]
+    assert "SET status = 'failed', error = 'stale'" in cur.queries[0][0]
+    assert "ON CONFLICT (dedupe_key)" in cur.queries[1][0]
+
+
+@pytest.mark.db
+def test_create_job_without_dedupe_key_always_inserts():
+    """Kinds that are not coalesced skip the stale check and always get a new job."""
+    cur = FakeCursor([(9, "queued")])
+
+    assert sql_helpers.create_job(cur, "recompute_analytics") == (9, "queued", True)
+    assert len(cur.queries) == 1
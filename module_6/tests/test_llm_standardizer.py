@@ -0,0 +1,353 @@
+"""Tests for the LLM standardizer helpers (no model download; the LLM call is faked)."""
+
+# pylint: disable=redefined-outer-name, protected-access
+
+import difflib
+import io
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+import pytest
+
+pytest.importorskip("llama_cpp")
+pytest.importorskip("huggingface_hub")
+
+LLM_DIR = os.path.join(os.path.dirname(__file__), "..", "worker", "etl", "llm_hosting")
+os.environ.setdefault("CANON_UNIS_PATH", os.path.join(LLM_DIR, "canon_universities.txt"))
+os.environ.setdefault("CANON_PROGS_PATH", os.path.join(LLM_DIR, "canon_programs.txt"))
+os.environ.setdefault("LLM_CACHE_PATH", "")  # in-memory only during tests
+sys.path.append(LLM_DIR)
+
+import app as llm_app  # pylint: disable=import-error, wrong-import-position
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Replace the model call with a counter that echoes a fixed answer."""
+    calls = []
+
+    def _fake(program_text):
+        calls.append(program_text)
+        return {"standardized_program": "Computer Science",
+                "standardized_university": "Stanford University"}
+
+    monkeypatch.setattr(llm_app, "_call_llm", _fake)
+    monkeypatch.setattr(llm_app, "CACHE", llm_app.ResultCache(""))
+    # Send every row to the (fake) model; the rules-first pass is tested separately.
+    monkeypatch.setattr(llm_app, "RULES_PROG_MIN_SCORE", 1.1)
+    monkeypatch.setattr(llm_app, "RULES_UNI_MIN_SCORE", 1.1)
+    monkeypatch.setattr(llm_app, "ROW_STATS", dict.fromkeys(llm_app.ROW_STATS, 0))
+    return calls
+
+
+@pytest.mark.llm
+def test_repeat_inputs_skip_inference(fake_llm):
+    """Inputs that normalize to the same key run the model once."""
+    first = llm_app._standardize("Computer Science, Stanford University")
+    second = llm_app._standardize("  computer science,   Stanford University ,")
+
+    assert first == second
+    assert len(fake_llm) == 1
+    assert llm_app.CACHE.stats()["hits"] == 1
+    assert llm_app.CACHE.stats()["misses"] == 1
+
+
+@pytest.mark.llm
+def test_cache_persists_across_instances(tmp_path):
+    """A new process (new cache object) reads results back from SQLite."""
+    path = str(tmp_path / "cache.sqlite3")
+    llm_app.ResultCache(path).put("cs, mit", "Computer Science", "Massachusetts Institute of Technology")
+
+    reopened = llm_app.ResultCache(path)
+
+    assert reopened.get("cs, mit") == ("Computer Science", "Massachusetts Institute of Technology")
+    assert reopened.stats()["disk_hits"] == 1
+
+
+@pytest.mark.llm
+def test_cache_is_keyed_by_model(tmp_path):
+    """Switching model files does not serve another model's answers."""
+    path = str(tmp_path / "cache.sqlite3")
+    llm_app.ResultCache(path, model="a.gguf").put("k", "P", "U")
+
+    assert llm_app.ResultCache(path, model="b.gguf").get("k") is None
+
+
+@pytest.mark.llm
+def test_cache_is_opened_on_first_use(tmp_path, monkeypatch):
+    """Nothing is created at import; the first lookup opens the configured file once."""
+    path = tmp_path / "cache.sqlite3"
+    monkeypatch.setattr(llm_app, "CACHE", None)
+    monkeypatch.setattr(llm_app, "LLM_CACHE_PATH", str(path))
+    assert not path.exists()
+
+    cache = llm_app._cache()
+
+    assert path.exists()
+    assert llm_app._cache() is cache
+
+
+@pytest.mark.llm
+def test_memory_lru_evicts_oldest():
+    """The in-memory layer keeps at most mem_size entries, dropping the least recent."""
+    cache = llm_app.ResultCache("", mem_size=2)
+    cache.put("a", "A", "U")
+    cache.put("b", "B", "U")
+    cache.get("a")
+    cache.put("c", "C", "U")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ("A", "U")
+
+
+@pytest.mark.llm
+def test_stats_endpoint_reports_counters(fake_llm):
+    """/standardize uses the cache and /stats reports it."""
+    client = llm_app.app.test_client()
+    rows = [{"program": "Computer Science, Stanford University"}] * 3
+
+    client.post("/standardize", json=rows)
+    body = client.get("/stats").get_json()
+
+    assert len(fake_llm) == 1
+    assert body["cache"]["hits"] == 2
+
+
+@pytest.mark.llm
+def test_parallel_stream_preserves_order(monkeypatch):
+    """Rows fanned out to a worker pool come back in input order, duplicates run once."""
+    calls = []
+
+    def _slow_echo(program_text):
+        calls.append(program_text)
+        # Earlier rows finish last, so completion order is the reverse of input order.
+        time.sleep(0.02 * (5 - int(program_text[-1])))
+        cost = {"calls": 1, "prompt_tokens": 10, "evaluated_tokens": 4, "seconds": 0.5}
+        return {"standardized_program": program_text, "standardized_university": "U"}, cost
+
+    monkeypatch.setattr(llm_app, "_infer", _slow_echo)
+    monkeypatch.setattr(llm_app, "CACHE", llm_app.ResultCache(""))
+    monkeypatch.setattr(llm_app, "ROW_STATS", dict.fromkeys(llm_app.ROW_STATS, 0))
+    monkeypatch.setattr(llm_app, "LLM_STATS", dict.fromkeys(llm_app.LLM_STATS, 0))
+    texts = ["row 1", "row 2", "row 3", "row 2", "row 4"]
+
+    with ThreadPool(4) as pool:
+        out = [r["standardized_program"] for r in llm_app._standardize_stream(texts, pool=pool)]
+
+    assert out == texts
+    assert sorted(calls) == ["row 1", "row 2", "row 3", "row 4"]
+    # Workers' costs are summed in this process, once per call rather than per row.
+    assert llm_app._llm_stats()["calls"] == 4
+    assert llm_app._llm_stats()["evaluated_tokens"] == 16
+    assert llm_app._row_stats()["llm"] == 4
+    assert llm_app._row_stats()["deduped"] == 1
+
+
+@pytest.mark.llm
+def test_annotate_rows_is_lazy(fake_llm):
+    """Rows are yielded one at a time rather than after the whole batch."""
+    rows = iter([{"program": "a"}, {"program": "b"}])
+
+    first = next(llm_app._annotate_rows(rows))
+
+    assert first["llm-generated-university"] == "Stanford University"
+    assert len(fake_llm) == 1
+
+
+def _typo(rng, text):
+    """Apply a few random deletions/insertions/substitutions to text."""
+    chars = list(text)
+    for _ in range(rng.randint(0, 4)):
+        i = rng.randrange(len(chars) + 1)
+        op = rng.random()
+        if op < 0.33 and i < len(chars):
+            del chars[i]
+        elif op < 0.66:
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz ,"))
+        elif i < len(chars):
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+@pytest.mark.llm
+@pytest.mark.parametrize("cutoff", [0.6, 0.84, 0.86, 0.95])
+def test_match_index_agrees_with_difflib(cutoff):
+    """The bigram index returns difflib's best match for typo'd canon names."""
+    rng = random.Random(11)
+    for canon, index in ((llm_app.CANON_UNIS, llm_app.UNI_INDEX),
+                         (llm_app.CANON_PROGS, llm_app.PROG_INDEX)):
+        queries = [_typo(rng, rng.choice(canon)) for _ in range(60)]
+        queries += ["", "a", "MIT", "Ucla", "University", "zzzz"]
+        for q in queries:
+            expected = difflib.get_close_matches(q, canon, n=1, cutoff=cutoff)
+            assert index.best(q, cutoff) == (expected[0] if expected else None), q
+
+
+@pytest.mark.llm
+def test_match_index_breaks_ties_like_difflib():
+    """Equal ratios resolve to the lexically largest choice, as in difflib."""
+    choices = ["abcx", "abcy", "abcz"]
+
+    assert llm_app.MatchIndex(choices).best("abc", 0.5) == "abcz"
+    assert difflib.get_close_matches("abc", choices, n=1, cutoff=0.5) == ["abcz"]
+
+
+class FakeLlama:
+    """Character-level stand-in for llama_cpp.Llama's prefix-matching KV cache."""
+
+    def __init__(self):
+        self.input_ids = np.zeros(4096, dtype=np.intc)
+        self.n_tokens = 0
+        self.evaluated = []
+
+    def create_chat_completion(self, messages, **_kwargs):
+        """Evaluate only the prompt tokens past the cached prefix, like Llama.generate."""
+        tokens = [ord(c) for c in json.dumps(messages)]
+        keep = llm_app.Llama.longest_token_prefix(self.input_ids[: self.n_tokens], tokens[:-1])
+        self.evaluated.append(len(tokens) - keep)
+        self.input_ids[: len(tokens)] = tokens
+        self.n_tokens = len(tokens)
+        answer = {"standardized_program": "Computer Science",
+                  "standardized_university": "Stanford University"}
+        return {"choices": [{"message": {"content": json.dumps(answer)}}],
+                "usage": {"prompt_tokens": len(tokens)}}
+
+    def reset(self):
+        """Forget every evaluated token."""
+        self.n_tokens = 0
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Install a FakeLlama as the loaded model with fresh counters."""
+    model = FakeLlama()
+    monkeypatch.setattr(llm_app, "_LLM", model)
+    monkeypatch.setattr(llm_app, "LLM_STATS", dict.fromkeys(llm_app.LLM_STATS, 0))
+    return model
+
+
+@pytest.mark.llm
+def test_prompt_prefix_is_reused_across_rows(fake_model):
+    """After the first row, each row evaluates only its own tokens, not the few-shot prefix."""
+    prefix = json.dumps(llm_app._build_messages("A")).index('A\\"}')
+
+    llm_app._call_llm("Computer Science, Stanford University")
+    llm_app._call_llm("Mathematics, MIT")
+
+    stats = llm_app._llm_stats()
+    assert stats["calls"] == 2
+    assert stats["prompt_tokens"] - stats["evaluated_tokens"] == prefix
+    assert fake_model.evaluated[-1] < 40
+
+
+@pytest.mark.llm
+@pytest.mark.parametrize("text, expected", [
+    ("Computer Science, Stanford University", ("Computer Science", "Stanford University")),
+    ("Information Studies, McG", ("Information Studies", "McGill University")),
+    ("Mathematics at University Of British Columbia",
+     ("Mathematics", "University of British Columbia")),
+    ("Electrical Engineering, University of California, Berkeley",
+     ("Electrical Engineering", "University of California, Berkeley")),
+])
+def test_rules_first_resolves_canonical_rows(text, expected):
+    """Rows that split cleanly onto the canon lists are answered without the model."""
+    assert llm_app._rules_first(text) == expected
+
+
+@pytest.mark.llm
+@pytest.mark.parametrize("text", ["cs, mit", "Computer Sciense, Stnfd Univ", "Physics", ""])
+def test_rules_first_leaves_ambiguous_rows_to_llm(text):
+    """Abbreviated, misspelled or unsplittable rows fall through to inference."""
+    assert llm_app._rules_first(text) is None
+
+
+@pytest.mark.llm
+def test_rules_threshold_is_configurable(monkeypatch):
+    """The university threshold decides whether a close misspelling skips the model."""
+    text = "Computer Science, Stanfrd University"
+    monkeypatch.setattr(llm_app, "RULES_UNI_MIN_SCORE", 1.0)
+    assert llm_app._rules_first(text) is None
+
+    monkeypatch.setattr(llm_app, "RULES_UNI_MIN_SCORE", 0.95)
+
+    assert llm_app._rules_first(text) == ("Computer Science", "Stanford University")
+
+
+@pytest.mark.llm
+def test_stats_report_rows_that_skipped_inference(fake_llm, monkeypatch):
+    """Only rows the rules cannot answer reach the model; /stats reports the split."""
+    monkeypatch.setattr(llm_app, "RULES_PROG_MIN_SCORE", 0.95)
+    monkeypatch.setattr(llm_app, "RULES_UNI_MIN_SCORE", 0.95)
+    rows = [{"program": "Computer Science, Stanford University"},
+            {"program": "Mathematics, McGill University"},
+            {"program": "cs @ stanford"},
+            {"program": "cs @ stanford"}]
+
+    llm_app.app.test_client().post("/standardize", json=rows)
+    body = llm_app.app.test_client().get("/stats").get_json()
+
+    assert fake_llm == ["cs @ stanford"]
+    assert body["rows"] == {"rows": 4, "cache_hits": 1, "rules": 2, "deduped": 0, "llm": 1,
+                            "skipped_inference": 0.75}
+
+
+@pytest.mark.llm
+@pytest.mark.parametrize("render", [
+    json.dumps,
+    lambda rows: json.dumps({"rows": rows}, indent=2),
+    lambda rows: "".join(json.dumps(r) + "\n" for r in rows),
+])
+def test_json_rows_are_streamed(render):
+    """Arrays, {'rows': [...]} and JSON Lines decode the same, even in tiny chunks."""
+    rows = [{"program": f"row {i}", "gpa": 3.5 + i / 100, "id": 10 ** 12 + i} for i in range(25)]
+
+    assert list(llm_app._iter_json_rows(io.StringIO(render(rows)), chunk_size=5)) == rows
+
+
+@pytest.mark.llm
+def test_json_array_is_decoded_lazily():
+    """Rows come out before the end of the file has been read."""
+    source = io.StringIO(json.dumps([{"program": "a"}, {"program": "b" * 1000}]))
+
+    first = next(llm_app._iter_json_rows(source, chunk_size=32))
+
+    assert first == {"program": "a"}
+    assert source.tell() < 100
+
+
+@pytest.mark.llm
+def test_append_resumes_after_rows_already_written(fake_llm, tmp_path, monkeypatch):
+    """--append skips rows in the output and drops a torn last line."""
+    rows = [{"program": f"row {i}"} for i in range(5)]
+    in_path = tmp_path / "in.jsonl"
+    in_path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    out_path = tmp_path / "out.jsonl"
+    llm_app._cli_process_file(str(in_path), str(out_path), append=False, to_stdout=False)
+    done = out_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    out_path.write_text("".join(done[:2]) + done[2][:10], encoding="utf-8")  # crash mid-row
+    fake_llm.clear()
+    monkeypatch.setattr(llm_app, "CACHE", llm_app.ResultCache(""))  # a fresh process
+
+    llm_app._cli_process_file(str(in_path), str(out_path), append=True, to_stdout=False)
+
+    out = [json.loads(line) for line in out_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["program"] for r in out] == [r["program"] for r in rows]
+    assert fake_llm == ["row 2", "row 3", "row 4"]
+
+
+@pytest.mark.llm
+def test_append_refuses_unrelated_output(fake_llm, tmp_path):
+    """Resuming against output from a different input fails instead of skipping rows."""
+    in_path = tmp_path / "in.json"
+    in_path.write_text(json.dumps([{"program": "a"}, {"program": "b"}]), encoding="utf-8")
+    out_path = tmp_path / "out.jsonl"
+    out_path.write_text(json.dumps({"program": "zzz"}) + "\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit):
+        llm_app._cli_process_file(str(in_path), str(out_path), append=True, to_stdout=False)
+    assert not fake_llm
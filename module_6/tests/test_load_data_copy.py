@@ -0,0 +1,300 @@
+"""Tests for the bulk-load and shadow-table reload paths of db/load_data.py."""
+
+import os
+import sys
+from datetime import date
+
+import psycopg
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "db"))
+
+import load_data  # pylint: disable=import-error, wrong-import-position
+from etl import normalize  # pylint: disable=import-error, wrong-import-position
+
+# What the catalog queries return for a live table built from db/init.sql (trimmed).
+CATALOG = {  # marker in the query -> rows; more specific markers first
+    "pg_get_indexdef": [("applicants_term_idx", "CREATE INDEX applicants_term_idx ON ONLY "
+                         "public.applicants USING btree (term_year, term_season)")],
+    "h.inhparent": [("applicants_2025_new", "applicants_2025_new_pkey"),
+                    ("applicants_default_new", "applicants_default_new_term_year_term_season_idx")],
+    "pg_inherits": [("applicants_2025", "FOR VALUES FROM (2025) TO (2026)"),
+                    ("applicants_default", "DEFAULT")],
+    "pg_constraint": [("applicants_pkey", "PRIMARY KEY (id, term_year)"),
+                      ("applicants_url_term_year_key", "UNIQUE (url, term_year)")],
+}
+URL = normalize.APPLICANT_COLUMNS.index("url")
+SUMMARY_DEF = (" SELECT 1 AS id, ( SELECT count(*) FROM applicants) AS fall2025_count;", True)
+
+
+class FakeCopy:
+    """Collects rows written through cursor.copy()."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def set_types(self, types):
+        """Record the binary COPY types."""
+        self.cursor.copy_types = types
+
+    def write_row(self, row):
+        """Record one staged row."""
+        self.cursor.copied.append(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConn:
+    """Counts commits and rollbacks."""
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        """Record a commit."""
+        self.commits += 1
+
+    def rollback(self):
+        """Record a rollback."""
+        self.rollbacks += 1
+
+
+class FakeCursor:
+    """Records statements as text and answers the catalog queries from CATALOG.
+
+    INSERTs into the shadow apply ON CONFLICT (url, term_year) DO NOTHING to
+    ``table``: a row-by-row INSERT adds its parameters, the INSERT ... SELECT
+    adds the staged rows in ord order. ``lock_failures`` makes that many swap
+    attempts fail on their first RENAME.
+    """
+
+    def __init__(self, summary=SUMMARY_DEF, lock_failures=0):
+        self.connection = FakeConn()
+        self.queries = []
+        self.copied = []
+        self.copy_types = None
+        self.rowcount = 0
+        self.summary = summary
+        self.lock_failures = lock_failures
+        self.table = {}
+        self._last = ""
+
+    def _insert(self, rows):
+        """Add rows whose (url, term_year) is new; returns how many were added."""
+        added = 0
+        for row in rows:
+            key = (row[URL], row[-1])
+            if key not in self.table:
+                self.table[key] = row
+                added += 1
+        return added
+
+    def execute(self, query, params=None):
+        """Capture the statement."""
+        text = query if isinstance(query, str) else query.as_string(None)
+        if text.startswith("ALTER TABLE applicants RENAME") and self.lock_failures:
+            self.lock_failures -= 1
+            raise psycopg.errors.LockNotAvailable("lock timeout")
+        self.queries.append((text.strip(), params))
+        self._last = text
+        if not text.lstrip().startswith("INSERT"):
+            self.rowcount = 1
+        elif params is not None:
+            self.rowcount = self._insert([params])
+        else:
+            self.rowcount = self._insert(row[1:] for row in sorted(self.copied))
+
+    def fetchall(self):
+        """Rows for whichever catalog query ran last."""
+        return next(rows for marker, rows in CATALOG.items() if marker in self._last)
+
+    def fetchone(self):
+        """The applicant_summary definition."""
+        return self.summary
+
+    def copy(self, statement):
+        """Start a fake COPY."""
+        self.queries.append((statement.as_string(None), None))
+        return FakeCopy(self)
+
+    def statements(self):
+        """Executed statement texts, in order."""
+        return [q for q, _ in self.queries]
+
+
+RECORDS = [
+    {"program": "CS", "degree_type": "Masters", "date_added": "Added on March 31, 2024",
+     "status": "Accepted", "url": "u1", "GPA": "3.90", "GRE_G": "N/A", "term": "Fall 2025"},
+    {"program": "Math", "url": "u2", "GPA": 3.5, "term": "Spring 2024", "comments": ""},
+]
+
+
+@pytest.mark.load
+def test_copy_rows_match_insert_rows():
+    """Both modes send identical row tuples, so the loaded table is the same."""
+    cur = FakeCursor()
+    seen, inserted = load_data.load_records(cur, RECORDS, mode="copy")
+
+    assert (seen, inserted) == (2, 2)
+    assert [row[1:] for row in cur.copied] == normalize.normalize_rows(RECORDS)
+    assert [row[0] for row in cur.copied] == [0, 1]  # file order, consumed by ORDER BY ord
+    assert cur.copy_types[:5] == ("int8", "text", "text", "text", "date") and cur.copy_types[-1] == "int4"
+
+    first = cur.copied[0][1:]
+    assert first[3] == date(2024, 3, 31) and first[6] == 3.9 and first[7] is None
+    assert first[-1] == 2025
+
+
+@pytest.mark.load
+def test_duplicate_urls_load_the_same_rows_in_both_modes():
+    """With repeated (url, term_year) keys the first line wins in both modes."""
+    records = RECORDS + [
+        dict(RECORDS[0], status="Rejected"),              # same key, later line: dropped
+        dict(RECORDS[1], term="Fall 2025"),               # same url, other term_year: kept
+        {"program": "Physics", "url": "u3", "term": "Fall 2025"},
+        {"program": "Physics", "url": "u3", "term": "Fall 2025", "GPA": "4.0"},
+    ]
+    tables = {}
+    for mode in ("insert", "copy"):
+        cur = FakeCursor()
+        assert load_data.load_records(cur, records, mode=mode) == (6, 4)
+        tables[mode] = cur.table
+
+    assert tables["insert"] == tables["copy"]
+    assert tables["copy"][("u1", 2025)][4] == "Accepted"
+    assert tables["copy"][("u3", 2025)][6] is None
+
+
+@pytest.mark.load
+def test_shadow_is_loaded_before_indexes_and_swap():
+    """Rows go into applicants_new, indexes are built after them, and only then is it swapped in."""
+    cur = FakeCursor()
+    load_data.load_records(cur, RECORDS, mode="copy")
+    order = cur.statements()
+
+    assert not any("TRUNCATE" in q for q in order)
+    assert 'ALTER TABLE "applicants_new" ADD CONSTRAINT "applicants_url_term_year_key_new" ' \
+           "UNIQUE (url, term_year)" in order
+    assert 'CREATE TABLE "applicants_default_new" PARTITION OF "applicants_new" DEFAULT' in order
+    insert = next(i for i, q in enumerate(order) if "ON CONFLICT (url, term_year) DO NOTHING" in q)
+    assert 'INSERT INTO "applicants_new"' in order[insert]
+    index = order.index("CREATE INDEX applicants_term_idx_new ON applicants_new "
+                        "USING btree (term_year, term_season)")
+    view = next(i for i, q in enumerate(order) if q.startswith('CREATE MATERIALIZED VIEW "applicant_summary_new"'))
+    assert "FROM applicants_new)" in order[view] and order[view].endswith("WITH DATA")
+    swap = order.index("ALTER TABLE applicants RENAME TO applicants_old")
+    assert insert < index < view < swap
+    assert cur.connection.commits == 1  # the shadow build; the caller commits the swap
+
+
+@pytest.mark.load
+def test_swap_drops_old_objects_then_restores_live_names():
+    """The swap drops the old table and view without CASCADE and renames every shadow object back."""
+    cur = FakeCursor()
+    load_data.load_records(cur, RECORDS, mode="insert")
+    order = cur.statements()
+    swap = order[order.index("ALTER TABLE applicants RENAME TO applicants_old") - 1:]
+
+    assert swap[0] == "SET LOCAL lock_timeout = '2s'"
+    drop = swap.index("DROP TABLE applicants_old")
+    assert swap.index("ALTER SEQUENCE applicants_id_seq OWNED BY applicants.id") < drop
+    assert swap.index('DROP MATERIALIZED VIEW "applicant_summary_old"') < drop
+    renames = swap[drop + 1:]
+    for shadow, live in [("applicants_2025_new", "applicants_2025"),
+                         ("applicants_pkey_new", "applicants_pkey"),
+                         ("applicants_term_idx_new", "applicants_term_idx"),
+                         ("applicants_2025_new_pkey", "applicants_2025_pkey"),
+                         ("applicant_summary_pk_new", "applicant_summary_pk")]:
+        assert any(f'"{shadow}" RENAME TO "{live}"' in q for q in renames), shadow
+    assert any(q.startswith("UPDATE ingestion_watermarks") and "last_offset = NULL" in q
+               for q in renames)
+
+
+@pytest.mark.load
+def test_unpopulated_summary_stays_unpopulated():
+    """A view created WITH NO DATA is cloned WITH NO DATA; no view means none is cloned."""
+    cur = FakeCursor(summary=(SUMMARY_DEF[0], False))
+    load_data.load_records(cur, RECORDS)
+    assert any(q.endswith("WITH NO DATA") for q in cur.statements())
+
+    cur = FakeCursor(summary=None)
+    load_data.load_records(cur, RECORDS)
+    assert not any("applicant_summary" in q and "DROP" not in q for q in cur.statements())
+
+
+@pytest.mark.load
+def test_swap_retries_when_readers_hold_the_lock(monkeypatch):
+    """A lock timeout rolls back the swap and retries it; the shadow is not rebuilt."""
+    monkeypatch.setattr(load_data.time, "sleep", lambda s: None)
+    cur = FakeCursor(lock_failures=2)
+    load_data.load_records(cur, RECORDS)
+
+    assert cur.connection.rollbacks == 2
+    assert cur.statements().count("DROP TABLE applicants_old") == 1
+    assert sum(q.startswith('INSERT INTO "applicants_new"') for q in cur.statements()) == 2
+
+
+@pytest.mark.load
+def test_unknown_mode_rejected():
+    """A typo in LOAD_MODE fails before anything is dropped or created."""
+    cur = FakeCursor()
+    with pytest.raises(ValueError):
+        load_data.load_records(cur, RECORDS, mode="bulk")
+    assert not cur.queries
+
+
+@pytest.fixture
+def live_db_cursor():
+    """A cursor on the configured database with db/init.sql applied; rolled back after use."""
+    try:
+        conn = psycopg.connect(dbname=load_data.DB_NAME, user=load_data.DB_USER,
+                               password=load_data.DB_PASS, host=load_data.DB_HOST,
+                               port=load_data.DB_PORT, connect_timeout=3)
+    except psycopg.OperationalError:
+        pytest.skip("no database reachable")
+    init_sql = os.path.join(os.path.dirname(__file__), "..", "db", "init.sql")
+    with open(init_sql, encoding="utf-8") as f:
+        conn.execute(f.read())
+    cur = conn.cursor()
+    load_data.ensure_watermark_table(cur)
+    yield cur
+    conn.rollback()  # pylint: disable=no-member
+    conn.close()     # pylint: disable=no-member
+
+
+@pytest.mark.db
+def test_shadow_swap_on_real_schema(live_db_cursor):  # pylint: disable=redefined-outer-name
+    """build_shadow and swap_shadow leave the schema with its live names and the new rows."""
+    cur = live_db_cursor
+
+    def names():
+        cur.execute("""
+            SELECT relname, relkind FROM pg_class
+            WHERE relname LIKE 'applicant%' AND relnamespace = 'public'::regnamespace
+            ORDER BY relname
+        """)
+        return cur.fetchall()
+
+    before = names()
+    cur.execute("""
+        INSERT INTO ingestion_watermarks (source, last_seen, last_offset)
+        VALUES ('load_data_test', '2025-01-01', 42)
+        ON CONFLICT (source) DO UPDATE SET last_seen = EXCLUDED.last_seen,
+                                           last_offset = EXCLUDED.last_offset
+    """)
+
+    renames, seen, inserted = load_data.build_shadow(cur, RECORDS + RECORDS[:1], mode="copy")
+    load_data.swap_shadow(cur, renames)
+
+    assert (seen, inserted) == (3, 2)
+    assert names() == before
+    cur.execute("SELECT url FROM applicants ORDER BY url")
+    assert cur.fetchall() == [("u1",), ("u2",)]
+    cur.execute("SELECT last_seen, last_offset FROM ingestion_watermarks "
+                "WHERE source = 'load_data_test'")
+    assert cur.fetchone() == (None, None)
@@ -0,0 +1,58 @@
+"""Tests for the shared, batched row normalization."""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "worker"))
+
+from etl import normalize  # pylint: disable=import-error, wrong-import-position
+
+MESSY_NUMBERS = ["3.90", " 320 ", ".5", "3.", "-1.5", "160/170", "4.5 (AW)", "N/A", "",
+                 None, 3, 3.7, "abc", "1e5", "²", "٣.٥"]
+
+
+@pytest.mark.normalize
+def test_parse_floats_matches_scalar_to_float():
+    """The batched fast path gives exactly what the first-number regex gives."""
+    assert normalize.parse_floats(MESSY_NUMBERS) == [normalize.to_float(v) for v in MESSY_NUMBERS]
+    assert normalize.parse_floats(["3.90", "160/170", "1e5", "N/A"]) == [3.9, 160.0, 1.0, None]
+
+
+@pytest.mark.normalize
+def test_parse_date_formats():
+    """GradCafe and ISO dates parse; impossible or unknown ones are None."""
+    assert normalize.parse_date("Added on March 31, 2024") == date(2024, 3, 31)
+    assert normalize.parse_date("mar 1, 2024") == date(2024, 3, 1)
+    assert normalize.parse_date("2024-03-31T12:00:00") == date(2024, 3, 31)
+    for bad in ("February 30, 2024", "Sept 3, 2024", "March 31 2024", "N/A", None):
+        assert normalize.parse_date(bad) is None
+
+
+@pytest.mark.normalize
+def test_normalize_rows_maps_every_column():
+    """A batch maps JSONL keys to applicants columns, cleaning placeholders."""
+    entries = [
+        {"program": "CS", "degree_type": "Masters", "comments": "N/A", "url": "u1",
+         "date_added": "Added on March 31, 2024", "GPA": "3.90", "GRE_G": "320",
+         "term": "Fall 2025", "US/International": "American", "llm-generated-university": ["odd"]},
+        {"url": "u2", "term": ""},
+    ]
+    rows = normalize.normalize_rows(entries)
+    first = dict(zip(normalize.APPLICANT_COLUMNS, rows[0]))
+
+    assert first["degree"] == "Masters" and first["comments"] is None
+    assert first["date_added"] == date(2024, 3, 31)
+    assert (first["gpa"], first["gre"], first["gre_v"]) == (3.9, 320.0, None)
+    assert first["term_year"] == 2025 and first["llm_generated_university"] == ["odd"]
+    assert rows[1] == (None,) * 5 + ("u2",) + (None,) * 9 + (0,)
+    assert normalize.as_row(normalize.normalize(entries[0])) == rows[0]
+
+
+@pytest.mark.normalize
+def test_iter_rows_batches_preserve_order():
+    """Streaming in small batches yields the same rows as one batch."""
+    entries = [{"url": f"u{i}", "GPA": str(i / 10), "term": f"Fall {2000 + i}"} for i in range(7)]
+    assert list(normalize.iter_rows(entries, size=3)) == normalize.normalize_rows(entries)
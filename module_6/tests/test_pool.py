@@ -0,0 +1,75 @@
+"""Tests for the web tier's pooled database connections."""
+
+import contextlib
+
+import pytest
+from psycopg_pool import PoolTimeout
+
+import run  # pylint: disable=import-error
+
+
+class FakePool:
+    """Stand-in for psycopg_pool.ConnectionPool with preset stats."""
+
+    def __init__(self, stats=None, conn=None, error=None):
+        self.stats = stats or {}
+        self.conn = conn
+        self.error = error
+        self.checkouts = 0
+
+    def get_stats(self):
+        """Return the preset stats."""
+        return self.stats
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Yield the preset connection, or raise the preset error."""
+        if self.error is not None:
+            raise self.error
+        self.checkouts += 1
+        yield self.conn
+
+
+@pytest.fixture(name="client")
+def fixture_client():
+    """Return a Flask test client."""
+    return run.app.test_client()
+
+
+@pytest.mark.web
+def test_get_conn_borrows_from_pool(monkeypatch):
+    """get_conn hands out pooled connections instead of opening new ones."""
+    pool = FakePool(conn="conn-1")
+    monkeypatch.setattr(run, "_POOL", pool)
+
+    with run.get_conn() as conn:
+        assert conn == "conn-1"
+    assert pool.checkouts == 1
+
+
+@pytest.mark.web
+def test_pool_metrics_endpoint(client, monkeypatch):
+    """/api/pool reports size, in-use connections and wait time."""
+    stats = {
+        "pool_min": 1, "pool_max": 10, "pool_size": 4, "pool_available": 1,
+        "requests_waiting": 2, "requests_num": 8, "requests_wait_ms": 40,
+    }
+    monkeypatch.setattr(run, "_POOL", FakePool(stats=stats))
+
+    body = client.get("/api/pool").get_json()
+
+    assert body["size"] == 4
+    assert body["in_use"] == 3
+    assert body["requests_waiting"] == 2
+    assert body["avg_wait_ms"] == 5.0
+
+
+@pytest.mark.web
+def test_pool_timeout_returns_503(client, monkeypatch):
+    """An exhausted pool surfaces as 503 rather than a stack trace."""
+    monkeypatch.setattr(run, "_POOL", FakePool(error=PoolTimeout("busy")))
+
+    response = client.get("/")
+
+    assert response.status_code == 503
+    assert response.get_json() == {"error": "database_busy"}
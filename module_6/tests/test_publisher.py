@@ -0,0 +1,167 @@
+"""Tests for the long-lived RabbitMQ publisher."""
+
+import json
+
+import pytest
+from pika import exceptions as pika_exc
+
+import publisher  # pylint: disable=import-error
+
+
+class FakeChannel:
+    """Records committed publishes; optionally fails the first one.
+
+    Messages are held until tx_commit, like a transactional channel.
+    """
+
+    def __init__(self, fail_first=False, fail_at=0):
+        self.is_open = True
+        self.transactional = False
+        self.commits = 0
+        self.uncommitted = []
+        self.published = []
+        self.routing_keys = []
+        self.fail_first = fail_first
+        self.fail_at = fail_at
+
+    def tx_select(self):
+        """Enable transactions."""
+        self.transactional = True
+
+    def tx_commit(self):
+        """Deliver everything published since the last commit."""
+        self.commits += 1
+        for routing_key, body in self.uncommitted:
+            self.published.append(json.loads(body))
+            self.routing_keys.append(routing_key)
+        self.uncommitted = []
+
+    def basic_publish(self, exchange, routing_key, body, properties, mandatory):  # pylint: disable=too-many-arguments, too-many-positional-arguments, unused-argument
+        """Hold the message, or simulate a dropped connection once (after ``fail_at`` sends)."""
+        if self.fail_first and len(self.uncommitted) >= self.fail_at:
+            self.fail_first = False
+            self.uncommitted = []  # the broker drops the open transaction
+            raise pika_exc.StreamLostError("connection reset")
+        self.uncommitted.append((routing_key, body))
+
+
+class FakeConnection:
+    """Minimal BlockingConnection stand-in."""
+
+    def __init__(self, lost=False):
+        self.is_open = True
+        self.lost = lost
+        self.pumped = 0
+
+    def process_data_events(self, time_limit=None):  # pylint: disable=unused-argument
+        """Count heartbeat pumps, or report the socket as gone."""
+        if self.lost:
+            raise pika_exc.StreamLostError("missed heartbeats")
+        self.pumped += 1
+
+    def close(self):
+        """Mark closed."""
+        self.is_open = False
+
+
+class Opener:
+    """Counts connections and hands out the next preset channel."""
+
+    def __init__(self, *channels, lost=False):
+        self.channels = list(channels)
+        self.opened = 0
+        self.lost = lost
+        self.conn = None
+
+    def __call__(self):
+        self.opened += 1
+        self.conn = FakeConnection(lost=self.lost)
+        return self.conn, self.channels.pop(0)
+
+
+@pytest.mark.buttons
+def test_connection_and_channel_are_reused():
+    """Several publishes share one transactional connection."""
+    ch = FakeChannel()
+    opener = Opener(ch)
+    pub = publisher.TaskPublisher(opener=opener)
+
+    pub.publish("scrape_new_data")
+    pub.publish("recompute_analytics", {"x": 1})
+
+    assert opener.opened == 1
+    assert ch.transactional
+    assert [m["kind"] for m in ch.published] == ["scrape_new_data", "recompute_analytics"]
+    assert ch.published[1]["payload"] == {"x": 1}
+
+
+@pytest.mark.buttons
+def test_reconnects_after_lost_connection():
+    """A stale connection is replaced and the publish retried."""
+    stale, fresh = FakeChannel(fail_first=True), FakeChannel()
+    opener = Opener(stale, fresh)
+    pub = publisher.TaskPublisher(opener=opener)
+
+    pub.publish("recompute_analytics")
+
+    assert opener.opened == 2
+    assert [m["kind"] for m in fresh.published] == ["recompute_analytics"]
+
+
+@pytest.mark.buttons
+def test_publish_many_uses_one_channel():
+    """publish_many sends a whole batch over the shared channel."""
+    ch = FakeChannel()
+    opener = Opener(ch)
+    pub = publisher.TaskPublisher(opener=opener)
+
+    sent = pub.publish_many([("scrape_new_data", {"since": "2025-01-01"})] * 5)
+
+    assert sent == 5
+    assert opener.opened == 1
+    assert len(ch.published) == 5
+    assert ch.commits == 1  # one broker round trip for the whole batch
+    assert pub.publish_many([]) == 0
+
+
+@pytest.mark.buttons
+def test_each_kind_is_routed_to_its_own_queue():
+    """Kinds get their own routing key; unknown kinds fall back to the shared queue."""
+    ch = FakeChannel()
+    pub = publisher.TaskPublisher(opener=Opener(ch))
+
+    pub.publish_many([("scrape_new_data", None), ("recompute_analytics", None), ("other", None)])
+
+    assert ch.routing_keys == ["scrape_new_data", "recompute_analytics", publisher.ROUTING_KEY]
+
+
+@pytest.mark.buttons
+def test_reconnect_resends_the_uncommitted_batch():
+    """A batch interrupted before its commit is resent whole on the new connection."""
+    stale, fresh = FakeChannel(fail_first=True, fail_at=2), FakeChannel()
+    pub = publisher.TaskPublisher(opener=Opener(stale, fresh), keepalive=0)
+
+    sent = pub.publish_many([("scrape_new_data", {"n": n}) for n in range(5)])
+
+    assert sent == 5
+    assert not stale.published
+    assert [m["payload"]["n"] for m in fresh.published] == [0, 1, 2, 3, 4]
+    assert fresh.commits == 1
+
+
+@pytest.mark.buttons
+def test_heartbeats_serviced_while_idle():
+    """The idle connection is pumped; one the broker dropped is discarded, then reopened."""
+    opener = Opener(FakeChannel(), FakeChannel())
+    pub = publisher.TaskPublisher(opener=opener, keepalive=0)
+    pub.service_heartbeats()  # nothing open yet
+    pub.publish("recompute_analytics")
+
+    pub.service_heartbeats()
+    assert opener.conn.pumped == 1
+
+    opener.conn.lost = True
+    pub.service_heartbeats()
+    assert not opener.conn.is_open
+    pub.publish("recompute_analytics")
+    assert opener.opened == 2
@@ -1,11 +1,23 @@
 """Flask web app (read-only): shows GradCafe ETL statistics."""
 
+import atexit
 import os
+import threading
 
 from flask import Flask, render_template, jsonify, current_app
-import psycopg
-from psycopg import sql
-from publisher import publish_task 
+from psycopg import errors
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool, PoolTimeout
+from publisher import publish_task
+from sql_helpers import (
+    SQL_JOBS_DDL,
+    create_job,
+    fail_job,
+    fetch_dashboard_counters,
+    fetch_dashboard_metrics,
+    fetch_dashboard_summary,
+    fetch_job,
+)
 
 app = Flask(__name__)
 app.secret_key = "secret_key"
@@ -16,216 +28,180 @@ DB_PASS = os.getenv("POSTGRES_PASSWORD", "postgres")
 DB_HOST = os.getenv("POSTGRES_HOST", "db")
 DB_PORT = int(os.getenv("POSTGRES_PORT", "5432"))
 
+# Connection pool sizing (per web process)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Seconds to wait for a connection
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+# Close idle extras after this
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "600"))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+
+# Background jobs: kinds whose duplicate requests join the job already in flight
+COALESCED_KINDS = {"scrape_new_data"}
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "3600"))  # seconds without progress
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_JOBS_READY = False
+
+
+def get_pool():
+    """Return the process-wide connection pool, opening it on first use."""
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                conninfo = make_conninfo(
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASS,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                )
+                _POOL = ConnectionPool(
+                    conninfo,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_idle=DB_POOL_MAX_IDLE,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                    check=ConnectionPool.check_connection,  # health check on checkout
+                    name="web",
+                    open=True,
+                )
+                atexit.register(_POOL.close)
+    return _POOL
+
 
 def get_conn():
-    return psycopg.connect(
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASS,
-        host=DB_HOST,
-        port=DB_PORT,
-    )
+    """Borrow a pooled connection; use as ``with get_conn() as conn``."""
+    return get_pool().connection()
+
+def _read_summary(conn):
+    """
+    Return precomputed metrics: the live counters, else the applicant_summary snapshot.
+    None if neither is available yet.
+    """
+    for fetch in (fetch_dashboard_counters, fetch_dashboard_summary):
+        try:
+            with conn.transaction(), conn.cursor() as cur:
+                metrics = fetch(cur)
+        except (errors.UndefinedTable, errors.ObjectNotInPrerequisiteState):
+            # Table/view not created yet, or the view was created WITH NO DATA.
+            metrics = None
+        if metrics is not None:
+            return metrics
+    return None
 
 @app.route("/")
 def index():
     """Render dashboard metrics."""
-    # Using context managers ensures clean close; also plays nicely with linters.
+    with get_conn() as conn:
+        # Fast path: one precomputed row (ingest-maintained counters or the materialized view).
+        metrics = _read_summary(conn)
+        if metrics is None:
+            # Fallback: all ten metrics in one aggregate pass over applicants.
+            with conn.cursor() as cur:
+                metrics = fetch_dashboard_metrics(cur)
+            metrics["refreshed_at"] = None
+
+    # Render your existing template (place it at module_6/web/templates/index.html)
+    return render_template("index.html", **metrics)
+
+@app.get("/api/pool")
+def api_pool():
+    """Expose connection pool metrics (size, in use, waiting, wait time)."""
+    stats = get_pool().get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    requests_num = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return jsonify({
+        "min_size": stats.get("pool_min"),
+        "max_size": stats.get("pool_max"),
+        "size": size,
+        "available": available,
+        "in_use": size - available,
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests_num": requests_num,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_wait_ms": wait_ms,
+        "avg_wait_ms": round(wait_ms / requests_num, 3) if requests_num else 0.0,
+        "requests_errors": stats.get("requests_errors", 0),
+        "connections_errors": stats.get("connections_errors", 0),
+    })
+
+
+@app.errorhandler(PoolTimeout)
+def pool_timeout(_exc):
+    """All pooled connections stayed busy for DB_POOL_TIMEOUT seconds."""
+    current_app.logger.warning("Timed out waiting for a database connection")
+    return jsonify({"error": "database_busy"}), 503
+
+def _ensure_jobs_table(cur):
+    """Create the jobs table once per process (older databases predate it)."""
+    global _JOBS_READY  # pylint: disable=global-statement
+    if not _JOBS_READY:
+        cur.execute(SQL_JOBS_DDL)
+        _JOBS_READY = True
+
+
+def _enqueue(kind):
+    """
+    Create (or join) a job for ``kind`` and publish it; return a 202/503 response.
+
+    The job row is committed before publishing so the worker can always find it.
+    """
+    dedupe_key = kind if kind in COALESCED_KINDS else None
     with get_conn() as conn, conn.cursor() as cur:
+        _ensure_jobs_table(cur)
+        job_id, status, created = create_job(cur, kind, dedupe_key, JOB_STALE_AFTER)
 
-        # 1) How many applied for Fall 2025
-        stmt_fall2025 = sql.SQL("""
-            SELECT COUNT(*)
-            FROM {tbl}
-            WHERE term ILIKE {pattern}
-            LIMIT 1
-        """).format(tbl=sql.Identifier("applicants"),
-                    pattern=sql.Literal("%Fall 2025%"))
-        cur.execute(stmt_fall2025)
-        count = cur.fetchone()[0]
-
-        # 2) Percent of international students
-        stmt_pct_intl = sql.SQL("""
-            SELECT ROUND(
-                100.0 * SUM(CASE WHEN us_or_international ILIKE {intl} THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0),
-                2
-            )
-            FROM {tbl}
-            LIMIT 1
-        """).format(tbl=sql.Identifier("applicants"),
-                    intl=sql.Literal("%International%"))
-        cur.execute(stmt_pct_intl)
-        percent_international = cur.fetchone()[0]
-
-        # 3) Average GPA and GRE scores
-        stmt_avgs = sql.SQL("""
-            SELECT AVG(gpa), AVG(gre), AVG(gre_v), AVG(gre_aw)
-            FROM {tbl}
-            LIMIT 1
-        """).format(tbl=sql.Identifier("applicants"))
-        cur.execute(stmt_avgs)
-        avg_gpa, avg_gre, avg_gre_v, avg_gre_aw = cur.fetchone()
-
-        # 4) Average GPA of American students (Fall 2025)
-        stmt_avg_gpa_american = sql.SQL("""
-            SELECT AVG(gpa)
-            FROM {tbl}
-            WHERE term = {term}
-              AND us_or_international = {flag}
-              AND gpa IS NOT NULL
-            LIMIT 1
-        """).format(tbl=sql.Identifier("applicants"),
-                    term=sql.Literal("Fall 2025"),
-                    flag=sql.Literal("American"))
-        cur.execute(stmt_avg_gpa_american)
-        avg_gpa_american = cur.fetchone()[0]
-
-        # 5) Percent acceptances for Fall 2025
-        stmt_pct_accept = sql.SQL("""
-            SELECT 100.0 * COUNT(*) FILTER (WHERE status ILIKE {acc}) / NULLIF(COUNT(*), 0)
-            FROM {tbl}
-            WHERE term = {term}
-            LIMIT 1
-        """).format(tbl=sql.Identifier("applicants"),
-                    acc=sql.Literal("Accepted%"),
-                    term=sql.Literal("Fall 2025"))
-        cur.execute(stmt_pct_accept)
-        percent_acceptances = cur.fetchone()[0]
-
-        # 6) Average GPA of acceptances (Fall 2025)
-        stmt_avg_gpa_accepted = sql.SQL("""
-            SELECT AVG(gpa)
-            FROM {tbl}
-            WHERE term = {term}
-              AND status ILIKE {acc}
-              AND gpa IS NOT NULL
-            LIMIT 1
-        """).format(tbl=sql.Identifier("applicants"),
-                    term=sql.Literal("Fall 2025"),
-                    acc=sql.Literal("%Accepted%"))
-        cur.execute(stmt_avg_gpa_accepted)
-        avg_gpa_accepted = cur.fetchone()[0]
-
-        # 7) Applicants to JHU for a Master’s in CS
-        stmt_jhu_ms_cs = sql.SQL("""
-            SELECT COUNT(*)
-            FROM {tbl}
-            WHERE (
-                llm_generated_university ILIKE {u1}
-                OR llm_generated_university ILIKE {u2}
-                OR llm_generated_university ILIKE {u3}
-            )
-            AND llm_generated_program ILIKE {prog_cs}
-            AND (
-                degree ILIKE {m1}
-                OR degree ILIKE {m2}
-                OR degree ILIKE {m3}
-                OR degree ILIKE {m4}
-            )
-            LIMIT 1
-        """).format(
-            tbl=sql.Identifier("applicants"),
-            u1=sql.Literal("%Johns Hopkins%"),
-            u2=sql.Literal("%JHU%"),
-            u3=sql.Literal("%Hopkins%"),
-            prog_cs=sql.Literal("%Computer Science%"),
-            m1=sql.Literal("%Master%"),
-            m2=sql.Literal("%MS%"),
-            m3=sql.Literal("%M.S.%"),
-            m4=sql.Literal("%Masters%"),
-        )
-        cur.execute(stmt_jhu_ms_cs)
-        jhu_apps = cur.fetchone()[0]
-
-        # 8) 2025 Georgetown PhD CS acceptances
-        stmt_gtown_phd_cs_2025 = sql.SQL("""
-            SELECT COUNT(*)
-            FROM {tbl}
-            WHERE term ILIKE {y2025}
-              AND status ILIKE {accept}
-              AND llm_generated_university ILIKE {gtown}
-              AND (
-                  degree ILIKE {phd1}
-                  OR degree ILIKE {phd2}
-                  OR degree ILIKE {phd3}
-              )
-              AND llm_generated_program ILIKE {prog_cs}
-            LIMIT 1
-        """).format(
-            tbl=sql.Identifier("applicants"),
-            y2025=sql.Literal("%2025%"),
-            accept=sql.Literal("%Accept%"),
-            gtown=sql.Literal("%Georgetown%"),
-            phd1=sql.Literal("%PhD%"),
-            phd2=sql.Literal("%Ph.D.%"),
-            phd3=sql.Literal("%Doctorate%"),
-            prog_cs=sql.Literal("%Computer Science%"),
-        )
-        cur.execute(stmt_gtown_phd_cs_2025)
-        gtown_apps = cur.fetchone()[0]
-
-        # 9) Fall 2025 Data Science applicants
-        stmt_ds = sql.SQL("""
-            SELECT COUNT(*)
-            FROM {tbl}
-            WHERE term ILIKE {term}
-              AND llm_generated_program ILIKE {prog}
-            LIMIT 1
-        """).format(
-            tbl=sql.Identifier("applicants"),
-            term=sql.Literal("%Fall 2025%"),
-            prog=sql.Literal("%Data Science%")
-        )
-        cur.execute(stmt_ds)
-        ds_apps = cur.fetchone()[0]
-
-        # 10) Number of applicants who submitted any GRE score
-        stmt_gre_submitters = sql.SQL("""
-            SELECT COUNT(*)
-            FROM {tbl}
-            WHERE gre IS NOT NULL
-               OR gre_v IS NOT NULL
-               OR gre_aw IS NOT NULL
-            LIMIT 1
-        """).format(tbl=sql.Identifier("applicants"))
-        cur.execute(stmt_gre_submitters)
-        count_gre = cur.fetchone()[0]
+    if created:
+        try:
+            publish_task(kind, payload={"job_id": job_id})
+        except Exception:
+            current_app.logger.exception("Failed to publish %s", kind)
+            with get_conn() as conn, conn.cursor() as cur:
+                fail_job(cur, job_id, "publish_failed")
+            return jsonify({"error": "publish_failed", "job_id": job_id}), 503
+
+    body = {"status": status, "task": kind, "job_id": job_id, "coalesced": not created}
+    return jsonify(body), 202, {"Location": f"/api/jobs/{job_id}"}
 
-    # Render your existing template (place it at module_6/web/templates/index.html)
-    return render_template(
-        "index.html",
-        count=count,
-        percent_international=percent_international,
-        avg_gpa=avg_gpa,
-        avg_gre=avg_gre,
-        avg_gre_v=avg_gre_v,
-        avg_gre_aw=avg_gre_aw,
-        avg_gpa_american=avg_gpa_american,
-        percent_acceptances=percent_acceptances,
-        avg_gpa_accepted=avg_gpa_accepted,
-        jhu_apps=jhu_apps,
-        gtown_apps=gtown_apps,
-        ds_apps=ds_apps,
-        count_gre=count_gre,
-    )
 
 @app.post("/api/scrape")
 def api_scrape():
-    try:
-        publish_task("scrape_new_data", payload={})
-        return jsonify({"status": "queued", "task": "scrape_new_data"}), 202
-    except Exception:
-        current_app.logger.exception("Failed to publish scrape_new_data")
-        return jsonify({"error": "publish_failed"}), 503
+    """Queue an incremental scrape, or return the one already in flight."""
+    return _enqueue("scrape_new_data")
 
 
 @app.post("/api/recompute")
 def api_recompute():
-    try:
-        publish_task("recompute_analytics", payload={})
-        return jsonify({"status": "queued", "task": "recompute_analytics"}), 202
-    except Exception:
-        current_app.logger.exception("Failed to publish recompute_analytics")
-        return jsonify({"error": "publish_failed"}), 503
+    """Queue a refresh of the dashboard summary."""
+    return _enqueue("recompute_analytics")
+
+
+def _seconds_between(start, end):
+    return round((end - start).total_seconds(), 3) if start and end else None
+
+
+@app.get("/api/jobs/<int:job_id>")
+def api_job(job_id):
+    """Report a job's status, row counts and timings."""
+    with get_conn() as conn, conn.cursor() as cur:
+        _ensure_jobs_table(cur)
+        job = fetch_job(cur, job_id)
+    if job is None:
+        return jsonify({"error": "not_found"}), 404
+
+    body = dict(job)
+    for key in ("created_at", "started_at", "finished_at", "updated_at"):
+        body[key] = job[key].isoformat() if job[key] else None
+    body["queued_seconds"] = _seconds_between(job["created_at"], job["started_at"])
+    body["run_seconds"] = _seconds_between(job["started_at"], job["finished_at"])
+    return jsonify(body)
 
 
 if __name__ == "__main__":
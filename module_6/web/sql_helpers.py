@@ -10,30 +10,20 @@ SQL_COUNT_JHU_CS_MASTERS = """
     SELECT COUNT(*)
     FROM applicants
     WHERE (
-        llm_generated_university ILIKE '%Johns Hopkins%'
+        llm_generated_university ILIKE '%Hopkins%'
         OR llm_generated_university ILIKE '%JHU%'
-        OR llm_generated_university ILIKE '%Hopkins%'
     )
       AND llm_generated_program ILIKE '%Computer Science%'
-      AND (
-          degree ILIKE '%Master%'
-          OR degree ILIKE '%MS%'
-          OR degree ILIKE '%M.S.%'
-          OR degree ILIKE '%Masters%'
-      )
+      AND degree_level = 'masters'
 """
 
 SQL_COUNT_GEORGETOWN_CS_PHD_2025 = """
     SELECT COUNT(*)
     FROM applicants
-    WHERE term ILIKE '%2025%'
-      AND status ILIKE '%Accept%'
+    WHERE term_year = 2025
+      AND status_kind = 'accepted'
       AND llm_generated_university ILIKE '%Georgetown%'
-      AND (
-          degree ILIKE '%PhD%'
-          OR degree ILIKE '%Ph.D.%'
-          OR degree ILIKE '%Doctorate%'
-      )
+      AND degree_level = 'phd'
       AND llm_generated_program ILIKE '%Computer Science%'
 """
 
@@ -49,38 +39,314 @@ SQL_COUNT_GRE_SUBMITTED = """
 # Helper functions for commonly repeated queries
 # -----------------------------------------------------
 
-def build_avg_gpa_stmt(term, status=None, us_flag=None):
+def build_avg_gpa_stmt(term_season, term_year, status_kind=None, us_flag=None):
     """
     Build a composed SQL statement for average GPA.
 
-    :param term: e.g. "Fall 2025"
-    :param status: e.g. "%Accepted%" or None
+    :param term_season: normalized season, e.g. "fall"
+    :param term_year: e.g. 2025
+    :param status_kind: normalized status, e.g. "accepted", or None
     :param us_flag: e.g. "American" or None
     """
-    where_clauses = [sql.SQL("term = {}").format(sql.Literal(term)),
+    where_clauses = [sql.SQL("term_year = {}").format(sql.Literal(term_year)),
+                     sql.SQL("term_season = {}").format(sql.Literal(term_season)),
                      sql.SQL("gpa IS NOT NULL")]
 
-    if status is not None:
-        where_clauses.insert(1, sql.SQL("status ILIKE {}").format(sql.Literal(status)))
+    if status_kind is not None:
+        where_clauses.insert(2, sql.SQL("status_kind = {}").format(sql.Literal(status_kind)))
 
     if us_flag is not None:
-        where_clauses.insert(1, sql.SQL("us_or_international = {}").format(sql.Literal(us_flag)))
+        where_clauses.insert(2, sql.SQL("us_or_international = {}").format(sql.Literal(us_flag)))
 
     return sql.SQL("SELECT AVG(gpa) FROM {tbl} WHERE " +
                    sql.SQL(" AND ").join(where_clauses).as_string(None) +
                    " LIMIT 1").format(tbl=sql.Identifier("applicants"))
 
 
-def build_ds_count_stmt(term, program_pattern):
+def build_ds_count_stmt(term_season, term_year, program_pattern):
     """Build a composed SQL statement to count Data Science applicants."""
     return sql.SQL("""
         SELECT COUNT(*)
         FROM {tbl}
-        WHERE term ILIKE {term}
+        WHERE term_year = {year}
+          AND term_season = {season}
           AND llm_generated_program ILIKE {prog}
         LIMIT 1
     """).format(
         tbl=sql.Identifier("applicants"),
-        term=sql.Literal(term),
+        year=sql.Literal(term_year),
+        season=sql.Literal(term_season),
         prog=sql.Literal(program_pattern)
     )
+
+
+# -----------------------------------------------------
+# Single-pass dashboard aggregate
+# -----------------------------------------------------
+
+# (template variable, column alias) for every dashboard metric, in SELECT order.
+# Aliases match the columns of the applicant_summary materialized view.
+DASHBOARD_METRICS = (
+    ("count", "fall2025_count"),
+    ("percent_international", "pct_international"),
+    ("avg_gpa", "avg_gpa"),
+    ("avg_gre", "avg_gre"),
+    ("avg_gre_v", "avg_gre_v"),
+    ("avg_gre_aw", "avg_gre_aw"),
+    ("avg_gpa_american", "avg_gpa_american_fall2025"),
+    ("percent_acceptances", "pct_accept_fall2025"),
+    ("avg_gpa_accepted", "avg_gpa_accepted_fall2025"),
+    ("jhu_apps", "jhu_ms_cs_count"),
+    ("gtown_apps", "gtown_cs_phd_2025_accepts"),
+    ("ds_apps", "ds_fall2025_count"),
+    ("count_gre", "gre_submitters_count"),
+)
+
+# All ten dashboard questions computed with FILTER clauses in one table scan.
+# Each FILTER predicate selects the same rows as the original standalone query,
+# but on the generated term_year/term_season/status_kind/degree_level columns
+# rather than its term ILIKE / status LIKE text matches.
+SQL_DASHBOARD_METRICS = """
+    SELECT
+        COUNT(*) FILTER (WHERE term_year = 2025 AND term_season = 'fall') AS fall2025_count,
+
+        ROUND(
+            100.0 * COUNT(*) FILTER (WHERE us_or_international ILIKE '%International%')
+            / NULLIF(COUNT(*), 0),
+            2
+        ) AS pct_international,
+
+        AVG(gpa)    AS avg_gpa,
+        AVG(gre)    AS avg_gre,
+        AVG(gre_v)  AS avg_gre_v,
+        AVG(gre_aw) AS avg_gre_aw,
+
+        AVG(gpa) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall'
+              AND us_or_international = 'American'
+              AND gpa IS NOT NULL
+        ) AS avg_gpa_american_fall2025,
+
+        100.0 * COUNT(*) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall' AND status_kind = 'accepted'
+        )
+        / NULLIF(COUNT(*) FILTER (WHERE term_year = 2025 AND term_season = 'fall'), 0)
+        AS pct_accept_fall2025,
+
+        AVG(gpa) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall'
+              AND status_kind = 'accepted'
+              AND gpa IS NOT NULL
+        ) AS avg_gpa_accepted_fall2025,
+
+        COUNT(*) FILTER (
+            WHERE (
+                llm_generated_university ILIKE '%Hopkins%'
+                OR llm_generated_university ILIKE '%JHU%'
+            )
+              AND llm_generated_program ILIKE '%Computer Science%'
+              AND degree_level = 'masters'
+        ) AS jhu_ms_cs_count,
+
+        COUNT(*) FILTER (
+            WHERE term_year = 2025
+              AND status_kind = 'accepted'
+              AND llm_generated_university ILIKE '%Georgetown%'
+              AND degree_level = 'phd'
+              AND llm_generated_program ILIKE '%Computer Science%'
+        ) AS gtown_cs_phd_2025_accepts,
+
+        COUNT(*) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall'
+              AND llm_generated_program ILIKE '%Data Science%'
+        ) AS ds_fall2025_count,
+
+        COUNT(*) FILTER (
+            WHERE gre IS NOT NULL
+               OR gre_v IS NOT NULL
+               OR gre_aw IS NOT NULL
+        ) AS gre_submitters_count
+    FROM applicants
+"""
+
+
+def fetch_dashboard_metrics(cur):
+    """
+    Run the single-pass dashboard aggregate and return a dict keyed by template variable.
+
+    :param cur: an open psycopg cursor
+    """
+    cur.execute(SQL_DASHBOARD_METRICS)
+    row = cur.fetchone()
+    return {key: value for (key, _), value in zip(DASHBOARD_METRICS, row)}
+
+
+# -----------------------------------------------------
+# Precomputed dashboard (applicant_summary materialized view)
+# -----------------------------------------------------
+
+SQL_DASHBOARD_SUMMARY = (
+    "SELECT "
+    + ", ".join(alias for _, alias in DASHBOARD_METRICS)
+    + ", refreshed_at FROM applicant_summary WHERE id = 1"
+)
+
+
+def fetch_dashboard_summary(cur):
+    """
+    Read the dashboard metrics from the single-row applicant_summary view.
+
+    Returns a dict keyed by template variable plus ``refreshed_at``, or None
+    when the view holds no snapshot yet.
+
+    :param cur: an open psycopg cursor
+    """
+    cur.execute(SQL_DASHBOARD_SUMMARY)
+    row = cur.fetchone()
+    if row is None or row[-1] is None:
+        return None
+    metrics = {key: value for (key, _), value in zip(DASHBOARD_METRICS, row)}
+    metrics["refreshed_at"] = row[-1]
+    return metrics
+
+
+# -----------------------------------------------------
+# Incrementally maintained dashboard (applicant_summary_counters)
+# -----------------------------------------------------
+
+# The worker adds each ingested batch's sums and counts to this single row
+# (worker/consumer.py SUMMARY_COUNTERS); averages and percentages are derived
+# here with the same rounding and NULL behaviour as SQL_DASHBOARD_METRICS.
+SQL_DASHBOARD_COUNTERS = """
+    SELECT
+        n_fall2025 AS fall2025_count,
+        ROUND(100.0 * n_international / NULLIF(n_total, 0), 2) AS pct_international,
+        sum_gpa / NULLIF(n_gpa, 0) AS avg_gpa,
+        sum_gre / NULLIF(n_gre, 0) AS avg_gre,
+        sum_gre_v / NULLIF(n_gre_v, 0) AS avg_gre_v,
+        sum_gre_aw / NULLIF(n_gre_aw, 0) AS avg_gre_aw,
+        sum_gpa_american_fall2025 / NULLIF(n_gpa_american_fall2025, 0) AS avg_gpa_american_fall2025,
+        100.0 * n_accepted_fall2025 / NULLIF(n_fall2025, 0) AS pct_accept_fall2025,
+        sum_gpa_accepted_fall2025 / NULLIF(n_gpa_accepted_fall2025, 0) AS avg_gpa_accepted_fall2025,
+        jhu_ms_cs_count,
+        gtown_cs_phd_2025_accepts,
+        ds_fall2025_count,
+        gre_submitters_count,
+        updated_at AS refreshed_at
+    FROM applicant_summary_counters
+    WHERE id = 1 AND rebuilt_at IS NOT NULL
+"""
+
+
+def fetch_dashboard_counters(cur):
+    """
+    Read the dashboard metrics from the incrementally maintained counters.
+
+    Same shape as fetch_dashboard_summary (``refreshed_at`` is the last
+    ingest or rebuild); None until the worker has seeded the counters.
+
+    :param cur: an open psycopg cursor
+    """
+    cur.execute(SQL_DASHBOARD_COUNTERS)
+    row = cur.fetchone()
+    if row is None:
+        return None
+    metrics = {key: value for (key, _), value in zip(DASHBOARD_METRICS, row)}
+    metrics["refreshed_at"] = row[-1]
+    return metrics
+
+
+# -----------------------------------------------------
+# Background jobs (one row per /api/scrape or /api/recompute request)
+# -----------------------------------------------------
+
+# Mirrors db/init.sql so deployments created before the table existed get it too.
+# At most one queued/running job per dedupe_key: duplicate requests share it.
+SQL_JOBS_DDL = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id BIGSERIAL PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        dedupe_key TEXT,
+        rows_seen BIGINT,
+        rows_inserted BIGINT,
+        error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        started_at TIMESTAMPTZ,
+        finished_at TIMESTAMPTZ,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_dedupe
+        ON jobs (dedupe_key) WHERE status IN ('queued', 'running');
+"""
+
+JOB_COLUMNS = (
+    "id", "kind", "status", "rows_seen", "rows_inserted", "error",
+    "created_at", "started_at", "finished_at", "updated_at",
+)
+
+SQL_FETCH_JOB = "SELECT " + ", ".join(JOB_COLUMNS) + " FROM jobs WHERE id = %s"
+
+
+def create_job(cur, kind, dedupe_key=None, stale_after=3600):
+    """
+    Record a new queued job, or join the active one with the same dedupe_key.
+
+    Active jobs not updated for ``stale_after`` seconds (e.g. the worker died)
+    are marked failed first so they cannot block new requests forever.
+    Returns ``(job_id, status, created)``.
+
+    :param cur: an open psycopg cursor
+    """
+    if dedupe_key is not None:
+        cur.execute(
+            """
+            UPDATE jobs
+            SET status = 'failed', error = 'stale', finished_at = now(), updated_at = now()
+            WHERE dedupe_key = %s AND status IN ('queued', 'running')
+              AND updated_at < now() - make_interval(secs => %s)
+            """,
+            (dedupe_key, stale_after),
+        )
+    # Loop: the active job may finish between the INSERT and the SELECT.
+    while True:
+        cur.execute(
+            """
+            INSERT INTO jobs (kind, dedupe_key) VALUES (%s, %s)
+            ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+            RETURNING id, status
+            """,
+            (kind, dedupe_key),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            return row[0], row[1], True
+        cur.execute(
+            "SELECT id, status FROM jobs WHERE dedupe_key = %s AND status IN ('queued', 'running')",
+            (dedupe_key,),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            return row[0], row[1], False
+
+
+def fail_job(cur, job_id, error):
+    """Mark a job failed (e.g. its message could not be published)."""
+    cur.execute(
+        """
+        UPDATE jobs SET status = 'failed', error = %s, finished_at = now(), updated_at = now()
+        WHERE id = %s
+        """,
+        (error, job_id),
+    )
+
+
+def fetch_job(cur, job_id):
+    """
+    Return one job as a dict keyed by JOB_COLUMNS, or None if it does not exist.
+
+    :param cur: an open psycopg cursor
+    """
+    cur.execute(SQL_FETCH_JOB, (job_id,))
+    row = cur.fetchone()
+    return dict(zip(JOB_COLUMNS, row)) if row else None
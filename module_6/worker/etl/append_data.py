@@ -3,10 +3,12 @@
 from __future__ import annotations
 import os
 import json
-import re
 import psycopg
 from typing import Iterable, Dict, Any, Optional
 
+# The worker runs with its root on sys.path, so etl.* resolves as in consumer.py.
+from etl.normalize import APPLICANT_COLUMNS, iter_row_batches  # pylint: disable=import-error
+
 # Config
 DEFAULT_FILE = os.getenv("DATA_FILE", "/app/data/full_out.jsonl")
 
@@ -23,22 +25,6 @@ def _db_dsn() -> str:
     return f"postgresql://{user}:{pwd}@{host}:{port}/{db}"
 
 # Helpers 
-_NUM_RE = re.compile(r'[-+]?\d*\.?\d+')
-
-def _to_float(v: Any) -> Optional[float]:
-    """Extract a float from messy strings like '3.9', '160/170', '4.5 (AW)', or return None."""
-    if v in (None, "", "N/A"):
-        return None
-    if isinstance(v, (int, float)):
-        return float(v)
-    s = str(v).strip()
-    m = _NUM_RE.search(s)
-    return float(m.group()) if m else None
-
-def _clean(v: Any) -> Optional[str]:
-    """Normalize empty placeholders to None."""
-    return None if v in ("N/A", "", None) else v
-
 def _iter_entries(path: str) -> Iterable[Dict[str, Any]]:
     """
     Yield entries from either:
@@ -63,6 +49,26 @@ def _iter_entries(path: str) -> Iterable[Dict[str, Any]]:
                 if line:
                     yield json.loads(line)
 
+def _mark_data_changed(cur) -> None:
+    """
+    Tell the analytics side that applicants changed, in the caller's transaction.
+
+    Bumps analytics_state.data_version so the next recompute refreshes the
+    dashboard view, and clears applicant_summary_counters.rebuilt_at so the
+    counters (which this path does not maintain row by row) are reseeded.
+    Either table may be missing on a database older than it.
+    """
+    cur.execute("""
+        DO $$ BEGIN
+            IF to_regclass('analytics_state') IS NOT NULL THEN
+                UPDATE analytics_state SET data_version = data_version + 1 WHERE id = 1;
+            END IF;
+            IF to_regclass('applicant_summary_counters') IS NOT NULL THEN
+                UPDATE applicant_summary_counters SET rebuilt_at = NULL WHERE id = 1;
+            END IF;
+        END $$
+    """)
+
 # Core 
 def append_data(filename: Optional[str] = None) -> int:
     """
@@ -75,42 +81,23 @@ def append_data(filename: Optional[str] = None) -> int:
     conn = psycopg.connect(dsn)
     cur = conn.cursor()
 
-    insert_sql = """
-        INSERT INTO applicants (
-            program, degree, comments, date_added, status, url,
-            gpa, gre, gre_v, gre_aw, term, us_or_international,
-            llm_generated_program, llm_generated_university, university
-        ) VALUES (
-            %(program)s, %(degree)s, %(comments)s, %(date_added)s, %(status)s, %(url)s,
-            %(gpa)s, %(gre)s, %(gre_v)s, %(gre_aw)s, %(term)s, %(us_or_international)s,
-            %(llm_generated_program)s, %(llm_generated_university)s, %(university)s
-        )
-        ON CONFLICT (url) DO NOTHING
+    insert_sql = f"""
+        INSERT INTO applicants ({", ".join(APPLICANT_COLUMNS)})
+        VALUES ({", ".join(["%s"] * len(APPLICANT_COLUMNS))})
+        ON CONFLICT (url, term_year) DO NOTHING
     """
 
-    n = 0
+    n = inserted = 0
     try:
-        for entry in _iter_entries(path):
-            row = {
-                "program": _clean(entry.get("program")),
-                "degree": _clean(entry.get("degree_type")),
-                "comments": _clean(entry.get("comments")),
-                "date_added": _clean(entry.get("date_added")),
-                "status": _clean(entry.get("status")),
-                "url": _clean(entry.get("url")),
-                "gpa": _to_float(entry.get("GPA")),
-                "gre": _to_float(entry.get("GRE_G")),
-                "gre_v": _to_float(entry.get("GRE_V")),
-                "gre_aw": _to_float(entry.get("GRE_AW")),
-                "term": _clean(entry.get("term")),
-                "us_or_international": _clean(entry.get("US/International")),
-                "llm_generated_program": _clean(entry.get("llm-generated-program")),
-                "llm_generated_university": _clean(entry.get("llm-generated-university")),
-                "university": _clean(entry.get("university")),
-            }
-            cur.execute(insert_sql, row)
-            n += 1
+        # Rows are normalized a batch at a time (etl/normalize.py) and each batch
+        # goes out with executemany, which pipelines the INSERTs.
+        for rows in iter_row_batches(_iter_entries(path)):
+            cur.executemany(insert_sql, rows)
+            n += len(rows)
+            inserted += max(cur.rowcount, 0)  # total over the batch; duplicates count 0
 
+        if inserted:
+            _mark_data_changed(cur)
         conn.commit()
         return n
     finally:
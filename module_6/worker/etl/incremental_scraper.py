@@ -5,29 +5,22 @@
 
 from __future__ import annotations
 import os, json, re
-from typing import List, Dict, Tuple, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
-DATA_FILE = os.getenv("DATA_FILE", "/app/data/full_out.jsonl")
+from etl.normalize import BATCH_SIZE, normalize_records, parse_date  # pylint: disable=import-error
 
-def _to_float(v):
-    if v in (None, "", "N/A"):
-        return None
-    try:
-        return float(v)
-    except Exception:
-        m = re.search(r"[-+]?\d*\.?\d+", str(v))
-        return float(m.group()) if m else None
+DATA_FILE = os.getenv("DATA_FILE", "/app/data/full_out.jsonl")
 
 def _sort_key(entry: Dict) -> Optional[str]:
     """
     Produce a monotonic-ish sort key for watermarking.
-    Prefer ISO-ish date strings in `date_added`; else fall back to numeric id parsed from URL.
+    Prefer the parsed `date_added` (as YYYY-MM-DD, so string order is date order);
+    else fall back to numeric id parsed from URL.
     Return None if neither is available.
     """
-    date = entry.get("date_added")
-    if isinstance(date, str) and re.match(r"^\d{4}-\d{2}-\d{2}", date.strip()):
-        # Good ISO-ish date (YYYY-MM-DD...) — safe for lexicographic compare
-        return date.strip()
+    added = parse_date(entry.get("date_added"))
+    if added is not None:
+        return added.isoformat()
 
     # Fallback: extract numeric id from url .../result/123456?...
     url = entry.get("url") or ""
@@ -37,56 +30,91 @@ def _sort_key(entry: Dict) -> Optional[str]:
         return f"id:{int(m.group(1)):012d}"
     return None
 
-def _normalize(entry: Dict) -> Dict:
-    """Map raw JSONL -> applicants table schema."""
-    return {
-        "program": entry.get("program"),
-        "degree": entry.get("degree_type"),
-        "comments": entry.get("comments"),
-        "date_added": entry.get("date_added"),
-        "status": entry.get("status"),
-        "url": entry.get("url"),
-        "gpa": _to_float(entry.get("GPA")),
-        "gre": _to_float(entry.get("GRE_G")),
-        "gre_v": _to_float(entry.get("GRE_V")),
-        "gre_aw": _to_float(entry.get("GRE_AW")),
-        "term": entry.get("term"),
-        "us_or_international": entry.get("US/International"),
-        "llm_generated_program": entry.get("llm-generated-program"),
-        "llm_generated_university": entry.get("llm-generated-university"),
-        "university": entry.get("university"),
-    }
-
-def run_scraper(since: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+def _key_kind(key: str) -> str:
+    return "id" if key.startswith("id:") else "date"
+
+def _key_rank(key: str) -> Tuple[int, str]:
+    """Order for the watermark: any date key outranks any "id:" key, so it never regresses."""
+    return (0 if _key_kind(key) == "id" else 1, key)
+
+class IncrementalBatch:  # pylint: disable=too-few-public-methods
+    """
+    Lazily yields normalized rows appended to DATA_FILE since the last run.
+
+    Iterating seeks straight to ``offset`` (the byte position where the previous
+    run stopped), so work scales with new data only. Rows are still filtered by
+    ``key >= since``. Selected records are normalized ``BATCH_SIZE`` at a time
+    (etl/normalize.py). While iterating, ``max_seen`` and ``offset`` advance
+    (up to the end of the batch being yielded); read them after the batch is
+    consumed to persist the new watermark.
+    """
+
+    def __init__(self, path: str, since: Optional[str] = None, offset: Optional[int] = None):
+        self.path = path
+        self.since = str(since) if since else None
+        self.start_offset = offset or 0
+        self.max_seen: Optional[str] = since
+        self.offset: int = self.start_offset
+
+    def _at_line_start(self, f) -> bool:
+        """True if ``start_offset`` is where a line begins, as it is for an offset we saved.
+
+        A file rewritten to the same or a larger size would otherwise pass the size
+        check and be resumed from the middle of some record.
+        """
+        if self.start_offset == 0:
+            return True
+        f.seek(self.start_offset - 1)
+        return f.read(1) == b"\n"
+
+    def __iter__(self) -> Iterator[Dict]:
+        since_key = self.since
+        pending: List[Dict] = []
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if self.start_offset > size or not self._at_line_start(f):
+                # File was truncated or replaced: rescan from the top.
+                self.start_offset = 0
+            f.seek(self.start_offset)
+            self.offset = self.start_offset
+
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partially written last line; pick it up next run.
+                    break
+                self.offset += len(line)
+                if not line.strip():
+                    continue
+
+                entry = json.loads(line)
+                key = _sort_key(entry)
+                # if we can't create a key, treat as new (include) so we don't miss data.
+                # Keys of different kinds (date vs "id:") don't order; include those too.
+                # >= keeps rows posted on the watermark's own date; ON CONFLICT drops repeats.
+                include = (key is None or since_key is None
+                           or _key_kind(key) != _key_kind(since_key) or key >= since_key)
+                if include:
+                    if key is not None and (self.max_seen is None
+                                            or _key_rank(key) > _key_rank(self.max_seen)):
+                        self.max_seen = key
+                    pending.append(entry)
+                    if len(pending) >= BATCH_SIZE:
+                        yield from normalize_records(pending)
+                        pending = []
+        yield from normalize_records(pending)
+
+
+def run_scraper(since: Optional[str] = None, offset: Optional[int] = None) -> IncrementalBatch:
     """
     Incremental loader:
-      - Reads /app/data/full_out.jsonl
+      - Reads /app/data/full_out.jsonl starting at byte ``offset`` (from the top if
+        the file no longer has a line boundary there)
       - Computes sort_key per entry
-      - Returns only rows with sort_key > since (string compare)
-      - Returns (rows, max_seen) where max_seen is the maximum sort_key observed
+      - Yields only rows with sort_key >= since (string compare)
+      - Returns an IncrementalBatch; after iterating it, ``batch.max_seen`` is the
+        maximum sort_key observed and ``batch.offset`` the byte position to resume from
     Notes:
-      - If since is None/empty → return EVERYTHING (first run).
+      - If since is None/empty and offset is None → yield EVERYTHING (first run).
       - We compare strings; ensure both since and keys are comparable strings (see _sort_key).
     """
-    rows: List[Dict] = []
-    max_seen: Optional[str] = since
-
-    # Normalize since to string (or None)
-    since_key = str(since) if since else None
-
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            entry = json.loads(line)
-            key = _sort_key(entry)
-            if key is None:
-                # if we can't create a key, treat as new (include) so we don't miss data
-                include = True if since_key is None else True
-            else:
-                include = (since_key is None) or (key > since_key)
-
-            if include:
-                rows.append(_normalize(entry))
-                if key is not None and (max_seen is None or key > max_seen):
-                    max_seen = key
-
-    return rows, max_seen
+    return IncrementalBatch(DATA_FILE, since=since, offset=offset)
@@ -3,14 +3,21 @@
 
 from __future__ import annotations
 
+import bisect
 import json
 import os
 import re
+import sqlite3
 import sys
 import difflib
-from typing import Any, Dict, List, Tuple
-
-from flask import Flask, jsonify, request
+import itertools
+import multiprocessing
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from flask import Flask, Response, jsonify, request, stream_with_context
 from huggingface_hub import hf_hub_download
 from llama_cpp import Llama  # CPU-only by default if N_GPU_LAYERS=0
 
@@ -30,6 +37,25 @@ N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
 N_CTX = int(os.getenv("N_CTX", "2048"))
 N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "0"))  # 0 → CPU-only
 
+# Parallel inference: LLM_WORKERS model processes share N_THREADS between them
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "1"))  # 1 → run inline, no pool
+# 0 → N_THREADS // LLM_WORKERS
+LLM_THREADS_PER_WORKER = int(os.getenv("LLM_THREADS_PER_WORKER", "0"))
+LLM_WINDOW = int(os.getenv("LLM_WINDOW", str(max(1, LLM_WORKERS) * 4)))  # rows in flight
+
+# Rules-first pass: rows whose halves match the canon lists at least this well skip the LLM
+# (difflib ratio, 1.0 = exact; set above 1 to send every row to the model)
+RULES_PROG_MIN_SCORE = float(os.getenv("RULES_PROG_MIN_SCORE", "0.95"))
+RULES_UNI_MIN_SCORE = float(os.getenv("RULES_UNI_MIN_SCORE", "0.95"))
+
+# Result cache: SQLite file shared by CLI and server ("" disables persistence).
+# The default sits next to this file, so it does not depend on the working directory.
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.sqlite3"),
+)
+LLM_CACHE_MEM_SIZE = int(os.getenv("LLM_CACHE_MEM_SIZE", "4096"))
+
 CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", "canon_universities.txt")
 CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", "canon_programs.txt")
 
@@ -137,10 +163,15 @@ def _load_llm() -> Llama:
     return _LLM
 
 
+def _split_parts(text: str) -> List[str]:
+    """Collapse whitespace and split on commas / ' at ' / ' @ '."""
+    s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
+    return [p.strip() for p in re.split(r",| at | @ ", s) if p.strip()]
+
+
 def _split_fallback(text: str) -> Tuple[str, str]:
     """Simple, rules-first parser if the model returns non-JSON."""
-    s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
-    parts = [p.strip() for p in re.split(r",| at | @ ", s) if p.strip()]
+    parts = _split_parts(text)
     prog = parts[0] if parts else ""
     uni = parts[1] if len(parts) > 1 else ""
 
@@ -162,12 +193,111 @@ def _split_fallback(text: str) -> Tuple[str, str]:
     return prog, uni
 
 
-def _best_match(name: str, candidates: List[str], cutoff: float = 0.86) -> str | None:
-    """Fuzzy match via difflib (lightweight, Replit-friendly)."""
-    if not name or not candidates:
-        return None
-    matches = difflib.get_close_matches(name, candidates, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
+def _bigrams(text: str) -> Counter:
+    """Multiset of adjacent character pairs in text."""
+    return Counter(text[i:i + 2] for i in range(len(text) - 1))
+
+
+class MatchIndex:
+    """
+    Bigram inverted index over a canonical list, for difflib-compatible lookups.
+
+    ``best(name, cutoff)`` returns exactly what
+    ``difflib.get_close_matches(name, choices, n=1, cutoff=cutoff)`` would, but
+    only scores candidates that can still reach the cutoff. If
+    ``ratio = 2*M / (la + lb) >= cutoff``, the M matched characters form k
+    blocks with k - 1 <= la + lb - 2*M (consecutive blocks are never adjacent
+    in both strings), so the pair shares at least M - k bigrams. Candidates
+    below that bound, or outside the length window, cannot match. Candidates
+    are visited by descending shared count and the bar rises to the best ratio
+    found so far, so typically only a handful are scored with SequenceMatcher.
+    """
+
+    def __init__(self, choices: Iterable[str]):
+        self.choices = list(choices)
+        self._exact = set(self.choices)
+        self._lengths = [len(c) for c in self.choices]
+        self._by_length = sorted(range(len(self.choices)), key=self._lengths.__getitem__)
+        self._sorted_lengths = [self._lengths[i] for i in self._by_length]
+        # _postings[k][gram]: choices containing gram at least k + 1 times
+        self._postings: List[Dict[str, List[int]]] = []
+        for idx, choice in enumerate(self.choices):
+            for gram, count in _bigrams(choice).items():
+                while len(self._postings) < count:
+                    self._postings.append({})
+                for k in range(count):
+                    self._postings[k].setdefault(gram, []).append(idx)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._exact
+
+    def __len__(self) -> int:
+        return len(self.choices)
+
+    def _shared_bigrams(self, name: str) -> Counter:
+        """Count bigrams (with multiplicity) each choice shares with name."""
+        shared: Counter = Counter()
+        for gram, count in _bigrams(name).items():
+            for postings in self._postings[:count]:
+                shared.update(postings.get(gram, ()))
+        return shared
+
+    def best(self, name: str, cutoff: float) -> str | None:
+        """Best choice with difflib ratio >= cutoff, ties broken as difflib does."""
+        found = self.match(name, cutoff)
+        return found[0] if found else None
+
+    def match(self, name: str, cutoff: float) -> Tuple[str, float] | None:
+        """Like best(), but return (choice, ratio)."""
+        if not name or not self.choices or cutoff > 1.0:
+            return None
+        if name in self._exact:
+            return name, 1.0
+
+        lb = len(name)
+        shared = self._shared_bigrams(name)
+        # Choices short enough that the bound allows zero shared bigrams.
+        slack = 1.5 * cutoff - 1.0
+        max_total = 1.0 / slack if slack > 0 else float("inf")
+        short = self._by_length[:bisect.bisect_right(self._sorted_lengths, max_total - lb)]
+        ranked = itertools.chain(shared.most_common(), ((i, 0) for i in short if i not in shared))
+        return self._best_ranked(name, ranked, cutoff)
+
+    def _best_ranked(self, name: str, ranked, cutoff: float) -> Tuple[str, float] | None:
+        """Score (index, shared bigrams) candidates, most shared first; return (choice, ratio)."""
+        lb = len(name)
+        s = difflib.SequenceMatcher()
+        s.set_seq2(name)
+        best: Tuple[float, str] | None = None
+        min_ratio = cutoff  # raised to the best ratio so far; only ties or better can win
+        for idx, count in ranked:
+            # Any choice within the length window has la + lb >= 2*lb / (2 - min_ratio), so
+            # once counts (descending) fall below that bound nothing later can match.
+            if count < (1.5 * min_ratio - 1.0) * 2.0 * lb / (2.0 - min_ratio) - 1.0 - 1e-9:
+                break
+            la = self._lengths[idx]
+            total = la + lb
+            if 2.0 * min(la, lb) < min_ratio * total - 1e-9:
+                continue
+            if count < (1.5 * min_ratio - 1.0) * total - 1.0 - 1e-9:
+                continue
+            choice = self.choices[idx]
+            s.set_seq1(choice)
+            if s.real_quick_ratio() >= min_ratio and s.quick_ratio() >= min_ratio:
+                ratio = s.ratio()
+                if ratio >= min_ratio and (best is None or (ratio, choice) > best):
+                    best = (ratio, choice)
+                    min_ratio = ratio
+        return (best[1], best[0]) if best else None
+
+
+UNI_INDEX = MatchIndex(CANON_UNIS)
+PROG_INDEX = MatchIndex(CANON_PROGS)
+
+
+def _best_match(name: str, index: MatchIndex, cutoff: float = 0.86) -> str | None:
+    """Fuzzy match against a canonical list via its bigram index."""
+    return index.best(name, cutoff)
 
 
 def _post_normalize_program(prog: str) -> str:
@@ -175,40 +305,65 @@ def _post_normalize_program(prog: str) -> str:
     p = (prog or "").strip()
     p = COMMON_PROG_FIXES.get(p, p)
     p = p.title()
-    if p in CANON_PROGS:
+    if p in PROG_INDEX:
         return p
-    match = _best_match(p, CANON_PROGS, cutoff=0.84)
+    match = _best_match(p, PROG_INDEX, cutoff=0.84)
     return match or p
 
 
-def _post_normalize_university(uni: str) -> str:
-    """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
+def _expand_university(uni: str) -> str:
+    """Expand abbreviations, apply common fixes and capitalization."""
     u = (uni or "").strip()
 
-    # Abbreviations
+    # Abbreviations (already officially capitalized)
     for pat, full in ABBREV_UNI.items():
         if re.fullmatch(pat, u):
-            u = full
-            break
+            return full
 
     # Common spelling fixes
     u = COMMON_UNI_FIXES.get(u, u)
+    if u in UNI_INDEX:
+        return u
 
     # Normalize 'Of' → 'of'
     if u:
         u = re.sub(r"\bOf\b", "of", u.title())
+    return u
+
+
+def _post_normalize_university(uni: str) -> str:
+    """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
+    u = _expand_university(uni)
 
     # Canonical or fuzzy map
-    if u in CANON_UNIS:
+    if u in UNI_INDEX:
         return u
-    match = _best_match(u, CANON_UNIS, cutoff=0.86)
+    match = _best_match(u, UNI_INDEX, cutoff=0.86)
     return match or u or "Unknown"
 
 
-def _call_llm(program_text: str) -> Dict[str, str]:
-    """Query the tiny LLM and return standardized fields."""
-    llm = _load_llm()
+def _rules_first(program_text: str) -> Tuple[str, str] | None:
+    """
+    Resolve "<program>, <university>" without the LLM when both halves map onto
+    the canon lists with at least RULES_PROG_MIN_SCORE / RULES_UNI_MIN_SCORE.
+    Returns None for anything ambiguous so the row goes to the model.
+    """
+    parts = _split_parts(program_text)
+    if len(parts) < 2:
+        return None
+    prog = COMMON_PROG_FIXES.get(parts[0], parts[0]).title()
+    prog_match = PROG_INDEX.match(prog, RULES_PROG_MIN_SCORE)
+    if prog_match is None:
+        return None
+    # University names may contain commas ("University of California, Berkeley").
+    uni_match = UNI_INDEX.match(_expand_university(", ".join(parts[1:])), RULES_UNI_MIN_SCORE)
+    if uni_match is None:
+        return None
+    return prog_match[0], uni_match[0]
+
 
+def _build_messages(program_text: str) -> List[Dict[str, str]]:
+    """System prompt + few-shot exchanges, then the row as the final user turn."""
     messages = [{"role": "system", "content": SYSTEM_PROMPT}]
     for x_in, x_out in FEW_SHOTS:
         messages.append(
@@ -226,13 +381,65 @@ def _call_llm(program_text: str) -> Dict[str, str]:
             "content": json.dumps({"program": program_text}, ensure_ascii=False),
         }
     )
+    return messages
+
+
+# ---------------- Per-row LLM cost ----------------
+LLM_STATS: Dict[str, Any] = {
+    "calls": 0,
+    "prompt_tokens": 0,
+    "evaluated_tokens": 0,
+    "seconds": 0.0,
+}
+
+
+def _evaluated_ids(llm: Llama) -> List[int]:
+    return llm.input_ids[: llm.n_tokens].tolist()
+
+
+def _add_llm_stats(cost: Dict[str, Any]) -> None:
+    """Fold one call's cost (from this process or a pool worker) into LLM_STATS."""
+    for name, value in cost.items():
+        LLM_STATS[name] += value
+
+
+def _llm_stats() -> Dict[str, Any]:
+    """Per-row prompt/eval token counts and latency, pool workers included."""
+    calls = LLM_STATS["calls"]
+    return {
+        **LLM_STATS,
+        "evaluated_tokens_per_row": LLM_STATS["evaluated_tokens"] / calls if calls else 0.0,
+        "ms_per_row": 1000.0 * LLM_STATS["seconds"] / calls if calls else 0.0,
+    }
+
+
+def _infer(program_text: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Query the tiny LLM; return the standardized fields and what the call cost.
+
+    This is what pool workers run: their counters would stay in the worker
+    process, so the cost travels back with the result for the parent to add.
+    """
+    llm = _load_llm()
 
+    # llama.cpp only evaluates prompt tokens past the prefix already in its KV
+    # cache, so the system prompt + few-shots shared by consecutive rows are reused.
+    before = _evaluated_ids(llm)
+    start = time.perf_counter()
     out = llm.create_chat_completion(
-        messages=messages,
+        messages=_build_messages(program_text),
         temperature=0.0,
         max_tokens=128,
         top_p=1.0,
     )
+    prompt_tokens = out["usage"]["prompt_tokens"]
+    reused = Llama.longest_token_prefix(before, llm.input_ids[: prompt_tokens - 1].tolist())
+    cost = {
+        "calls": 1,
+        "prompt_tokens": prompt_tokens,
+        "evaluated_tokens": prompt_tokens - reused,
+        "seconds": time.perf_counter() - start,
+    }
 
     text = (out["choices"][0]["message"]["content"] or "").strip()
     try:
@@ -248,7 +455,234 @@ def _call_llm(program_text: str) -> Dict[str, str]:
     return {
         "standardized_program": std_prog,
         "standardized_university": std_uni,
-    }
+    }, cost
+
+
+def _call_llm(program_text: str) -> Dict[str, str]:
+    """Query the tiny LLM in this process and return standardized fields."""
+    result, cost = _infer(program_text)
+    _add_llm_stats(cost)
+    return result
+
+
+# ---------------- Result cache ----------------
+def _cache_key(program_text: str) -> str:
+    """Normalize raw program text so trivially different inputs share a cache entry."""
+    return re.sub(r"\s+", " ", program_text or "").strip().strip(",").strip().casefold()
+
+
+class ResultCache:
+    """
+    Two-level cache: normalized program text -> (standardized_program, standardized_university).
+
+    An in-memory LRU (``mem_size`` entries) sits in front of a SQLite table, so
+    results persist across CLI runs and are shared with the HTTP server. Entries
+    are keyed by model file too, so switching models never serves stale answers.
+    """
+
+    def __init__(self, path: str, mem_size: int = 4096, model: str = MODEL_FILE):
+        self.model = model
+        self.mem_size = mem_size
+        self._mem: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " model TEXT NOT NULL, key TEXT NOT NULL,"
+                " program TEXT NOT NULL, university TEXT NOT NULL,"
+                " PRIMARY KEY (model, key))"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, value: Tuple[str, str]) -> None:
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_size:
+            self._mem.popitem(last=False)
+
+    def get(self, key: str) -> Tuple[str, str] | None:
+        """Return a cached (program, university) or None, updating hit/miss counters."""
+        with self._lock:
+            value = self._mem.get(key)
+            if value is not None:
+                self._mem.move_to_end(key)
+                self._counts["hits"] += 1
+                return value
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT program, university FROM llm_cache WHERE model = ? AND key = ?",
+                    (self.model, key),
+                ).fetchone()
+                if row is not None:
+                    value = (row[0], row[1])
+                    self._remember(key, value)
+                    self._counts["hits"] += 1
+                    self._counts["disk_hits"] += 1
+                    return value
+            self._counts["misses"] += 1
+            return None
+
+    def put(self, key: str, program: str, university: str) -> None:
+        """Store a result in memory and on disk."""
+        with self._lock:
+            self._remember(key, (program, university))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (model, key, program, university)"
+                    " VALUES (?, ?, ?, ?)",
+                    (self.model, key, program, university),
+                )
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for reporting."""
+        with self._lock:
+            counts = self._counts
+            lookups = counts["hits"] + counts["misses"]
+            return {
+                **counts,
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+                "mem_entries": len(self._mem),
+            }
+
+
+# Opened on first use rather than at import, so spawned pool workers and tools
+# that only import this module never create or lock the SQLite file.
+CACHE: ResultCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache() -> ResultCache:
+    """Return the shared result cache, opening it on first use."""
+    global CACHE  # pylint: disable=global-statement
+    with _CACHE_LOCK:
+        if CACHE is None:
+            CACHE = ResultCache(LLM_CACHE_PATH, mem_size=LLM_CACHE_MEM_SIZE)
+        return CACHE
+
+
+# "deduped" rows waited on an identical row already in flight to the pool.
+ROW_STATS: Dict[str, int] = {"rows": 0, "cache_hits": 0, "rules": 0, "deduped": 0, "llm": 0}
+
+
+def _resolve_without_llm(key: str, program_text: str) -> Dict[str, str] | None:
+    """Answer from the result cache or the rules-first pass; None means run the LLM."""
+    ROW_STATS["rows"] += 1
+    found = _cache().get(key)
+    if found is not None:
+        ROW_STATS["cache_hits"] += 1
+    else:
+        found = _rules_first(program_text)
+        if found is None:
+            return None
+        ROW_STATS["rules"] += 1
+    return {"standardized_program": found[0], "standardized_university": found[1]}
+
+
+def _row_stats() -> Dict[str, Any]:
+    """How rows were answered, and the fraction that avoided inference."""
+    rows = ROW_STATS["rows"]
+    skipped = ROW_STATS["cache_hits"] + ROW_STATS["rules"] + ROW_STATS["deduped"]
+    return {**ROW_STATS, "skipped_inference": skipped / rows if rows else 0.0}
+
+
+def _standardize(program_text: str) -> Dict[str, str]:
+    """Return standardized fields, running the LLM only for rows rules and cache can't answer."""
+    key = _cache_key(program_text)
+    resolved = _resolve_without_llm(key, program_text)
+    if resolved is not None:
+        return resolved
+    ROW_STATS["llm"] += 1
+    result = _call_llm(program_text)
+    _cache().put(key, result["standardized_program"], result["standardized_university"])
+    return result
+
+
+# ---------------- Parallel inference ----------------
+_POOL: Any = None
+_POOL_LOCK = threading.Lock()
+
+
+def _init_worker(n_threads: int) -> None:
+    """Pool initializer: give this process its thread share and load its own model."""
+    global N_THREADS, _LLM  # pylint: disable=global-statement
+    N_THREADS = n_threads
+    _LLM = None
+    _load_llm()
+
+
+def _get_pool(workers: int = LLM_WORKERS) -> Any:
+    """Return the shared process pool of model instances, or None when running inline."""
+    global _POOL  # pylint: disable=global-statement
+    if workers <= 1:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            threads = LLM_THREADS_PER_WORKER or max(1, N_THREADS // workers)
+            # spawn: llama.cpp state must not be inherited through fork
+            ctx = multiprocessing.get_context("spawn")
+            _POOL = ctx.Pool(workers, initializer=_init_worker, initargs=(threads,))
+        return _POOL
+
+
+def _standardize_stream(texts: Iterable[str], pool: Any = None) -> Iterator[Dict[str, str]]:
+    """
+    Standardize many program strings, yielding results in input order.
+
+    Cache hits and rules-first matches resolve immediately; the rest are fanned
+    out to the worker pool. Up to LLM_WINDOW rows are in flight, so each result
+    streams back as soon as every row before it has finished.
+    """
+    if pool is None:
+        pool = _get_pool()
+    if pool is None:
+        for text in texts:
+            yield _standardize(text)
+        return
+
+    window: Deque[Tuple[str, Any]] = deque()
+    inflight: Dict[str, Any] = {}  # key -> AsyncResult, so duplicates share one call
+
+    def _resolve(key: str, pending: Any) -> Dict[str, str]:
+        if isinstance(pending, dict):
+            return pending
+        result, cost = pending.get()
+        if inflight.get(key) is pending:  # first row waiting on this call
+            del inflight[key]
+            _add_llm_stats(cost)
+            _cache().put(key, result["standardized_program"], result["standardized_university"])
+        return result
+
+    for text in texts:
+        key = _cache_key(text)
+        resolved = _resolve_without_llm(key, text)
+        if resolved is not None:
+            window.append((key, resolved))
+        else:
+            if key in inflight:
+                ROW_STATS["deduped"] += 1
+            else:
+                ROW_STATS["llm"] += 1
+                inflight[key] = pool.apply_async(_infer, (text,))
+            window.append((key, inflight[key]))
+        while len(window) >= LLM_WINDOW:
+            yield _resolve(*window.popleft())
+
+    while window:
+        yield _resolve(*window.popleft())
+
+
+def _annotate_rows(rows: Iterable[Dict[str, Any]], pool: Any = None) -> Iterator[Dict[str, Any]]:
+    """Yield each row with llm-generated-* fields added, in input order."""
+    rows_a, rows_b = itertools.tee(rows)
+    texts = (((row or {}).get("program") or "") for row in rows_a)
+    for row, result in zip(rows_b, _standardize_stream(texts, pool=pool)):
+        row["llm-generated-program"] = result["standardized_program"]
+        row["llm-generated-university"] = result["standardized_university"]
+        yield row
 
 
 def _normalize_input(payload: Any) -> List[Dict[str, Any]]:
@@ -266,54 +700,176 @@ def health() -> Any:
     return jsonify({"ok": True})
 
 
+@app.get("/stats")
+def stats() -> Any:
+    """Report how rows were answered, result-cache counters and per-row LLM cost."""
+    return jsonify({"rows": _row_stats(), "cache": _cache().stats(), "llm": _llm_stats()})
+
+
 @app.post("/standardize")
 def standardize() -> Any:
-    """Standardize rows from an HTTP request and return JSON."""
+    """Standardize rows from an HTTP request and return JSON.
+
+    With ``?stream=1`` rows are sent back as JSON Lines as soon as they finish.
+    """
     payload = request.get_json(force=True, silent=True)
     rows = _normalize_input(payload)
 
-    out: List[Dict[str, Any]] = []
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        result = _call_llm(program_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-        out.append(row)
+    if request.args.get("stream"):
+        def _lines() -> Iterator[str]:
+            for row in _annotate_rows(rows):
+                yield json.dumps(row, ensure_ascii=False) + "\n"
+        return Response(stream_with_context(_lines()), mimetype="application/x-ndjson")
 
+    out: List[Dict[str, Any]] = list(_annotate_rows(rows))
     return jsonify({"rows": out})
 
 
+class _JsonStream:
+    """Decode JSON values from a text file a chunk at a time."""
+
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 16):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the unread part of the buffer; False at EOF."""
+        if self._eof:
+            return False
+        data = self._f.read(self._chunk_size)
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self, skip: str = " \t\r\n") -> str:
+        """Skip the given characters and return the next one ("" at EOF)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in skip:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def advance(self) -> None:
+        """Consume the character returned by peek()."""
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending exactly at the buffer edge may continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+
+def _iter_json_rows(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield rows from a JSON array, a {'rows': [...]} object, or JSON Lines.
+
+    Arrays and JSON Lines are decoded one row at a time, so memory stays flat
+    however large the file is.
+    """
+    stream = _JsonStream(f, chunk_size)
+    if stream.peek() == "[":
+        stream.advance()
+        while stream.peek(" \t\r\n,") not in ("]", ""):
+            yield stream.value()
+        return
+    while stream.peek():
+        value = stream.value()
+        if isinstance(value, dict) and isinstance(value.get("rows"), list):
+            yield from value["rows"]
+        else:
+            yield value
+
+
+def _resume_offset(out_path: str) -> Tuple[int, Dict[str, Any] | None]:
+    """
+    Count complete rows already in a JSONL output and return (count, last row).
+
+    A torn last line left by a crash mid-write is truncated away so the next
+    row starts on a fresh line.
+    """
+    count, last_line, good_bytes = 0, b"", 0
+    with open(out_path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            good_bytes += len(line)
+            if line.strip():
+                count += 1
+                last_line = line
+        f.truncate(good_bytes)
+    return count, (json.loads(last_line) if last_line else None)
+
+
+def _input_fields(row: Any) -> Any:
+    """A row without the fields this tool adds, for comparing input and output."""
+    if not isinstance(row, dict):
+        return row
+    return {k: v for k, v in row.items() if not k.startswith("llm-generated-")}
+
+
 def _cli_process_file(
     in_path: str,
     out_path: str | None,
     append: bool,
     to_stdout: bool,
 ) -> None:
-    """Process a JSON file and write JSONL incrementally."""
-    with open(in_path, "r", encoding="utf-8") as f:
-        rows = _normalize_input(json.load(f))
+    """Stream rows from a JSON/JSONL file and write JSONL incrementally.
 
+    With ``append`` the rows already in the output file are skipped, so an
+    interrupted run restarts where it stopped.
+    """
+    skip, last_done = 0, None
     sink = sys.stdout if to_stdout else None
     if not to_stdout:
         out_path = out_path or (in_path + ".jsonl")
+        if append and os.path.exists(out_path):
+            skip, last_done = _resume_offset(out_path)
         mode = "a" if append else "w"
         sink = open(out_path, mode, encoding="utf-8")
 
     assert sink is not None  # for type-checkers
 
     try:
-        for row in rows:
-            program_text = (row or {}).get("program") or ""
-            result = _call_llm(program_text)
-            row["llm-generated-program"] = result["standardized_program"]
-            row["llm-generated-university"] = result["standardized_university"]
-
-            json.dump(row, sink, ensure_ascii=False)
-            sink.write("\n")
-            sink.flush()
+        with open(in_path, "r", encoding="utf-8") as f:
+            rows = _iter_json_rows(f)
+            if skip:
+                done = deque(itertools.islice(rows, skip), maxlen=1)
+                if not done or _input_fields(done[0]) != _input_fields(last_done):
+                    raise SystemExit(
+                        f"{out_path} does not continue {in_path}; "
+                        "use a new --out or drop --append"
+                    )
+                print(f"resume: skipping {skip} rows already in {out_path}", file=sys.stderr)
+
+            for row in _annotate_rows(rows):
+                json.dump(row, sink, ensure_ascii=False)
+                sink.write("\n")
+                sink.flush()
     finally:
         if sink is not sys.stdout:
             sink.close()
+        print(f"rows: {json.dumps(_row_stats())}", file=sys.stderr)
+        print(f"cache: {json.dumps(_cache().stats())}", file=sys.stderr)
+        print(f"llm: {json.dumps(_llm_stats())}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -324,7 +880,7 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--file",
-        help="Path to JSON input (list of rows or {'rows': [...]})",
+        help="Path to JSON input (list of rows, {'rows': [...]} or JSON Lines)",
         default=None,
     )
     parser.add_argument(
@@ -341,7 +897,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "--append",
         action="store_true",
-        help="Append to the output file instead of overwriting.",
+        help="Append to the output file, skipping rows it already contains.",
     )
     parser.add_argument(
         "--stdout",
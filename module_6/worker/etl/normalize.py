@@ -0,0 +1,213 @@
+"""Map scraped GradCafe records to applicants rows, a column at a time.
+
+Every ingest path (the incremental scraper, append_data, db/load_data.py and
+the worker's batch insert) goes through this module, so they agree on what a
+row looks like. Records are normalized in batches: each field is pulled out
+as one column and parsed in a single pass, with the common cases kept off
+the regex path: plain numeric strings go through one ``map(float, ...)``,
+GradCafe dates are matched by one precompiled pattern instead of strptime, and
+dates and terms are parsed once per distinct value in the batch.
+"""
+
+from __future__ import annotations
+import re
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# (applicants column, JSONL key, kind); term_year is derived from the term.
+FIELDS: Tuple[Tuple[str, str, str], ...] = (
+    ("program", "program", "text"),
+    ("degree", "degree_type", "text"),
+    ("comments", "comments", "text"),
+    ("date_added", "date_added", "date"),
+    ("status", "status", "text"),
+    ("url", "url", "text"),
+    ("gpa", "GPA", "float"),
+    ("gre", "GRE_G", "float"),
+    ("gre_v", "GRE_V", "float"),
+    ("gre_aw", "GRE_AW", "float"),
+    ("term", "term", "text"),
+    ("us_or_international", "US/International", "text"),
+    ("llm_generated_program", "llm-generated-program", "text"),
+    ("llm_generated_university", "llm-generated-university", "text"),
+    ("university", "university", "text"),
+    ("term_year", "term", "year"),
+)
+
+APPLICANT_COLUMNS: Tuple[str, ...] = tuple(column for column, _, _ in FIELDS)
+
+BATCH_SIZE = 1000  # records normalized together when streaming
+
+_MISSING = (None, "", "N/A")
+_NUMBER = re.compile(r"[-+]?\d*\.?\d+")
+_ISO_DATE = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+_YEAR = re.compile(r"\d{4}")
+_DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y")
+# "March 31, 2024" / "Mar 31, 2024" without strptime: the month is looked up by name.
+_MONTH_DAY_YEAR = re.compile(r"([a-z]+)\s+(\d{1,2}),\s+(\d{4})", re.I)
+_MONTHS = {
+    name: i
+    for i, full in enumerate(("january", "february", "march", "april", "may", "june", "july",
+                              "august", "september", "october", "november", "december"), 1)
+    for name in (full, full[:3])
+}
+
+
+def to_float(v: Any) -> Optional[float]:
+    """First number in messy strings like '3.9', '160/170', '4.5 (AW)'; None for 'N/A'."""
+    if v in _MISSING:
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    m = _NUMBER.search(str(v))
+    return float(m.group()) if m else None
+
+
+def _parse_month_day_year(s: str) -> Optional[date]:
+    # "March 31, 2024" by month-name lookup; strptime only for anything unusual.
+    m = _MONTH_DAY_YEAR.fullmatch(s)
+    month = _MONTHS.get(m.group(1).lower()) if m else None
+    if month:
+        try:
+            return date(int(m.group(3)), month, int(m.group(2)))
+        except ValueError:
+            return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_date(v: Any) -> Optional[date]:
+    """Parse GradCafe's "Added on March 31, 2024" (or an ISO date); None if unparseable."""
+    if v in _MISSING:
+        return None
+    if isinstance(v, date):
+        return v
+    s = str(v).strip()
+    m = _ISO_DATE.match(s)
+    if m:
+        try:
+            return date.fromisoformat(m.group(1))
+        except ValueError:
+            return None
+    if s.lower().startswith("added on"):
+        s = s[len("added on"):].strip()
+    return _parse_month_day_year(s)
+
+
+def term_year(term: Any) -> int:
+    """Admission cycle year from a term like "Fall 2025" (the partition key); 0 if unknown."""
+    m = _YEAR.search(term) if isinstance(term, str) else None
+    return int(m.group()) if m else 0
+
+
+def _is_plain_number(s: str) -> bool:
+    # "3.85", "320", ".5": digits with at most one dot, which float() parses
+    # exactly as the first-number regex would. Anything else takes the slow path.
+    return s.replace(".", "", 1).isdigit()
+
+
+def parse_floats(values: Sequence[Any]) -> List[Optional[float]]:
+    """to_float over a column: plain numeric strings in one batch, the rest one by one."""
+    out: List[Optional[float]] = [None] * len(values)
+    plain_at: List[int] = []
+    plain: List[str] = []
+    for i, v in enumerate(values):
+        if isinstance(v, str):
+            s = v.strip()
+            if _is_plain_number(s):
+                plain_at.append(i)
+                plain.append(s)
+                continue
+        out[i] = to_float(v)
+    try:
+        parsed = list(map(float, plain))
+    except ValueError:
+        # isdigit() accepts a few non-ASCII digits float() rejects (e.g. superscripts)
+        parsed = [to_float(s) for s in plain]
+    for i, f in zip(plain_at, parsed):
+        out[i] = f
+    return out
+
+
+def _memoized(parse, values: Sequence[Any]) -> List[Any]:
+    # Dates and terms repeat heavily within a scrape, so parse each distinct value once.
+    cache: Dict[Any, Any] = {}
+    out = []
+    for v in values:
+        try:
+            out.append(cache[v])
+        except KeyError:
+            out.append(cache.setdefault(v, parse(v)))
+        except TypeError:  # unhashable junk
+            out.append(parse(v))
+    return out
+
+
+def parse_dates(values: Sequence[Any]) -> List[Optional[date]]:
+    """parse_date over a column."""
+    return _memoized(parse_date, values)
+
+
+def term_years(values: Sequence[Any]) -> List[int]:
+    """term_year over a column."""
+    return _memoized(term_year, values)
+
+
+_PARSERS = {
+    "text": lambda values: [None if v in _MISSING else v for v in values],
+    "float": parse_floats,
+    "date": parse_dates,
+    "year": term_years,
+}
+
+
+def normalize_columns(entries: Sequence[Dict[str, Any]]) -> Dict[str, list]:
+    """Normalize a batch of raw JSONL records into one list per applicants column."""
+    return {
+        column: _PARSERS[kind]([e.get(key) for e in entries])
+        for column, key, kind in FIELDS
+    }
+
+
+def normalize_rows(entries: Sequence[Dict[str, Any]]) -> List[tuple]:
+    """Normalize a batch of raw records into row tuples in APPLICANT_COLUMNS order."""
+    columns = normalize_columns(entries)
+    return list(zip(*(columns[c] for c in APPLICANT_COLUMNS)))
+
+
+def normalize_records(entries: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize a batch of raw records into dicts keyed by applicants column."""
+    return [dict(zip(APPLICANT_COLUMNS, row)) for row in normalize_rows(entries)]
+
+
+def normalize(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a single raw record (a batch of one)."""
+    return normalize_records([entry])[0]
+
+
+def iter_row_batches(
+    entries: Iterable[Dict[str, Any]], size: int = BATCH_SIZE
+) -> Iterator[List[tuple]]:
+    """Stream raw records as lists of row tuples, normalizing ``size`` records at a time."""
+    it = iter(entries)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield normalize_rows(batch)
+
+
+def iter_rows(entries: Iterable[Dict[str, Any]], size: int = BATCH_SIZE) -> Iterator[tuple]:
+    """Stream row tuples from raw records, normalizing ``size`` records at a time."""
+    for rows in iter_row_batches(entries, size):
+        yield from rows
+
+
+def as_row(record: Dict[str, Any]) -> tuple:
+    """A normalized record (dict keyed by column) as a tuple in APPLICANT_COLUMNS order."""
+    return tuple(map(record.get, APPLICANT_COLUMNS))
@@ -9,30 +9,20 @@ SQL_COUNT_JHU_CS_MASTERS = """
     SELECT COUNT(*)
     FROM applicants
     WHERE (
-        llm_generated_university ILIKE '%Johns Hopkins%'
+        llm_generated_university ILIKE '%Hopkins%'
         OR llm_generated_university ILIKE '%JHU%'
-        OR llm_generated_university ILIKE '%Hopkins%'
     )
       AND llm_generated_program ILIKE '%Computer Science%'
-      AND (
-          degree ILIKE '%Master%'
-          OR degree ILIKE '%MS%'
-          OR degree ILIKE '%M.S.%'
-          OR degree ILIKE '%Masters%'
-      )
+      AND degree_level = 'masters'
 """
 
 SQL_COUNT_GEORGETOWN_CS_PHD_2025 = """
     SELECT COUNT(*)
     FROM applicants
-    WHERE term ILIKE '%2025%'
-      AND status ILIKE '%Accept%'
+    WHERE term_year = 2025
+      AND status_kind = 'accepted'
       AND llm_generated_university ILIKE '%Georgetown%'
-      AND (
-          degree ILIKE '%PhD%'
-          OR degree ILIKE '%Ph.D.%'
-          OR degree ILIKE '%Doctorate%'
-      )
+      AND degree_level = 'phd'
       AND llm_generated_program ILIKE '%Computer Science%'
 """
 
@@ -48,38 +38,141 @@ SQL_COUNT_GRE_SUBMITTED = """
 # Helper functions for commonly repeated queries
 # -----------------------------------------------------
 
-def build_avg_gpa_stmt(term, status=None, us_flag=None):
+def build_avg_gpa_stmt(term_season, term_year, status_kind=None, us_flag=None):
     """
     Build a composed SQL statement for average GPA.
 
-    :param term: e.g. "Fall 2025"
-    :param status: e.g. "%Accepted%" or None
+    :param term_season: normalized season, e.g. "fall"
+    :param term_year: e.g. 2025
+    :param status_kind: normalized status, e.g. "accepted", or None
     :param us_flag: e.g. "American" or None
     """
-    where_clauses = [sql.SQL("term = {}").format(sql.Literal(term)),
+    where_clauses = [sql.SQL("term_year = {}").format(sql.Literal(term_year)),
+                     sql.SQL("term_season = {}").format(sql.Literal(term_season)),
                      sql.SQL("gpa IS NOT NULL")]
 
-    if status is not None:
-        where_clauses.insert(1, sql.SQL("status ILIKE {}").format(sql.Literal(status)))
+    if status_kind is not None:
+        where_clauses.insert(2, sql.SQL("status_kind = {}").format(sql.Literal(status_kind)))
 
     if us_flag is not None:
-        where_clauses.insert(1, sql.SQL("us_or_international = {}").format(sql.Literal(us_flag)))
+        where_clauses.insert(2, sql.SQL("us_or_international = {}").format(sql.Literal(us_flag)))
 
     return sql.SQL("SELECT AVG(gpa) FROM {tbl} WHERE " +
                    sql.SQL(" AND ").join(where_clauses).as_string(None) +
                    " LIMIT 1").format(tbl=sql.Identifier("applicants"))
 
 
-def build_ds_count_stmt(term, program_pattern):
+def build_ds_count_stmt(term_season, term_year, program_pattern):
     """Build a composed SQL statement to count Data Science applicants."""
     return sql.SQL("""
         SELECT COUNT(*)
         FROM {tbl}
-        WHERE term ILIKE {term}
+        WHERE term_year = {year}
+          AND term_season = {season}
           AND llm_generated_program ILIKE {prog}
         LIMIT 1
     """).format(
         tbl=sql.Identifier("applicants"),
-        term=sql.Literal(term),
+        year=sql.Literal(term_year),
+        season=sql.Literal(term_season),
         prog=sql.Literal(program_pattern)
     )
+
+
+# Single-pass dashboard aggregate
+
+# (template variable, column alias) for every dashboard metric, in SELECT order.
+# Aliases match the columns of the applicant_summary materialized view.
+DASHBOARD_METRICS = (
+    ("count", "fall2025_count"),
+    ("percent_international", "pct_international"),
+    ("avg_gpa", "avg_gpa"),
+    ("avg_gre", "avg_gre"),
+    ("avg_gre_v", "avg_gre_v"),
+    ("avg_gre_aw", "avg_gre_aw"),
+    ("avg_gpa_american", "avg_gpa_american_fall2025"),
+    ("percent_acceptances", "pct_accept_fall2025"),
+    ("avg_gpa_accepted", "avg_gpa_accepted_fall2025"),
+    ("jhu_apps", "jhu_ms_cs_count"),
+    ("gtown_apps", "gtown_cs_phd_2025_accepts"),
+    ("ds_apps", "ds_fall2025_count"),
+    ("count_gre", "gre_submitters_count"),
+)
+
+# All ten dashboard questions computed with FILTER clauses in one table scan.
+# Each FILTER predicate selects the same rows as the original standalone query,
+# but on the generated term_year/term_season/status_kind/degree_level columns
+# rather than its term ILIKE / status LIKE text matches.
+SQL_DASHBOARD_METRICS = """
+    SELECT
+        COUNT(*) FILTER (WHERE term_year = 2025 AND term_season = 'fall') AS fall2025_count,
+
+        ROUND(
+            100.0 * COUNT(*) FILTER (WHERE us_or_international ILIKE '%International%')
+            / NULLIF(COUNT(*), 0),
+            2
+        ) AS pct_international,
+
+        AVG(gpa)    AS avg_gpa,
+        AVG(gre)    AS avg_gre,
+        AVG(gre_v)  AS avg_gre_v,
+        AVG(gre_aw) AS avg_gre_aw,
+
+        AVG(gpa) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall'
+              AND us_or_international = 'American'
+              AND gpa IS NOT NULL
+        ) AS avg_gpa_american_fall2025,
+
+        100.0 * COUNT(*) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall' AND status_kind = 'accepted'
+        )
+        / NULLIF(COUNT(*) FILTER (WHERE term_year = 2025 AND term_season = 'fall'), 0)
+        AS pct_accept_fall2025,
+
+        AVG(gpa) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall'
+              AND status_kind = 'accepted'
+              AND gpa IS NOT NULL
+        ) AS avg_gpa_accepted_fall2025,
+
+        COUNT(*) FILTER (
+            WHERE (
+                llm_generated_university ILIKE '%Hopkins%'
+                OR llm_generated_university ILIKE '%JHU%'
+            )
+              AND llm_generated_program ILIKE '%Computer Science%'
+              AND degree_level = 'masters'
+        ) AS jhu_ms_cs_count,
+
+        COUNT(*) FILTER (
+            WHERE term_year = 2025
+              AND status_kind = 'accepted'
+              AND llm_generated_university ILIKE '%Georgetown%'
+              AND degree_level = 'phd'
+              AND llm_generated_program ILIKE '%Computer Science%'
+        ) AS gtown_cs_phd_2025_accepts,
+
+        COUNT(*) FILTER (
+            WHERE term_year = 2025 AND term_season = 'fall'
+              AND llm_generated_program ILIKE '%Data Science%'
+        ) AS ds_fall2025_count,
+
+        COUNT(*) FILTER (
+            WHERE gre IS NOT NULL
+               OR gre_v IS NOT NULL
+               OR gre_aw IS NOT NULL
+        ) AS gre_submitters_count
+    FROM applicants
+"""
+
+
+def fetch_dashboard_metrics(cur):
+    """
+    Run the single-pass dashboard aggregate and return a dict keyed by template variable.
+
+    :param cur: an open psycopg cursor
+    """
+    cur.execute(SQL_DASHBOARD_METRICS)
+    row = cur.fetchone()
+    return {key: value for (key, _), value in zip(DASHBOARD_METRICS, row)}